@@ -0,0 +1,90 @@
+"""Size and throughput of the zstd output writers per compression level.
+
+Builds a large archive by repeating the tweets of DATA.json with fresh ids,
+writes it as indented JSON, plain JSONL and .jsonl.zst/.csv.zst at several
+levels, and reads every compressed file back with read_records. The
+repeated tweets compress better than a real archive, pass --source with a
+large scraped JSON file for realistic ratios.
+
+    python benchmarks/bench_zstd_output.py --records 50000 --levels 1 3 6 9 19
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from profile_info import write_records, read_records  # noqa: E402
+
+
+def build_records(source, count):
+    with open(source, encoding="utf-8") as file:
+        tweets = list(json.load(file).values())
+    records = {}
+    for number in range(count):
+        tweet = dict(tweets[number % len(tweets)])
+        tweet["tweet_id"] = str(1600000000000000000 + number)
+        tweet["likes"] = number % 997
+        records[tweet["tweet_id"]] = tweet
+    return records
+
+
+def measure(label, location, write, records, uncompressed_size):
+    started = time.perf_counter()
+    write()
+    write_seconds = time.perf_counter() - started
+    size = os.path.getsize(location)
+    read_seconds = None
+    if location.endswith(".zst"):
+        started = time.perf_counter()
+        read_count = sum(1 for _ in read_records(location))
+        read_seconds = time.perf_counter() - started
+        assert read_count == len(records)
+    print("{:<16}{:>12,}{:>8.1f}x{:>12.1f}{:>12}".format(
+        label, size, uncompressed_size / size, uncompressed_size / write_seconds / 2 ** 20,
+        "{:.1f}".format(uncompressed_size / read_seconds / 2 ** 20) if read_seconds else "-"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--source", default=os.path.join(os.path.dirname(
+        os.path.dirname(os.path.abspath(__file__))), "DATA.json"))
+    parser.add_argument("--records", type=int, default=50000)
+    parser.add_argument("--levels", type=int, nargs="+",
+                        default=[1, 3, 6, 9, 12, 19])
+    args = parser.parse_args()
+
+    records = build_records(args.source, args.records)
+    directory = tempfile.mkdtemp()
+    try:
+        baseline = os.path.join(directory, "baseline.json")
+
+        def write_indented():
+            with open(baseline, "w", encoding="utf-8") as file:
+                json.dump(records, file, ensure_ascii=False, indent=4)
+        started = time.perf_counter()
+        write_indented()
+        uncompressed_size = os.path.getsize(baseline)
+        print("{:,} records, indented JSON is {:,} bytes ({:.1f} MiB/s)\n".format(
+            len(records), uncompressed_size, uncompressed_size / (time.perf_counter() - started) / 2 ** 20))
+        print("{:<16}{:>12}{:>9}{:>12}{:>12}".format(
+            "output", "bytes", "ratio", "write MiB/s", "read MiB/s"))
+        plain = os.path.join(directory, "plain.jsonl")
+        measure("jsonl", plain, lambda: write_records(
+            records, plain), records, uncompressed_size)
+        for extension in ("jsonl", "csv"):
+            for level in args.levels:
+                location = os.path.join(
+                    directory, "level{}.{}.zst".format(level, extension))
+                measure("{}.zst -{}".format(extension, level), location,
+                        lambda: write_records(records, location, level), records, uncompressed_size)
+        print("\nratio and throughput are relative to the indented JSON size")
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+import os
+import time
+import shutil
+import socket
+from typing import Union
+from profile_info import logger
+
+try:
+    import fcntl
+except ImportError:
+    # windows
+    fcntl = None
+    import msvcrt
+
+
+class WarmCache:
+    """
+    Hands out reusable browser profile directories, so the Twitter scripts,
+    styles and fonts downloaded by one run are served from the disk cache in
+    the next one. Every running browser gets its own slot directory, locked
+    with a lock file for as long as the browser runs, so concurrent workers
+    never share a profile. The lock is held on the open lock file, so the OS
+    releases it when the process dies and there are no stale locks.
+
+    <root>/<browser>/slot-<n>/profile is the browser profile and
+    <root>/<browser>/slot-<n>/cache the disk cache. Caches above max_bytes are
+    emptied when their slot is released, slots unused for max_age are
+    removed by cleanup, which runs at most every cleanup_interval.
+
+    Whether chrome behind the selenium-wire proxy actually serves the assets
+    from this cache has not been checked yet, test_cached_assets_are_not_fetched_again
+    needs chrome and chromedriver and has not been run.
+    """
+
+    def __init__(self, root: str, browser: str, max_bytes: int = 512 * 2 ** 20, max_age: float = 7 * 24 * 3600,
+                 max_slots: Union[int, None] = None, cleanup_interval: float = 3600):
+        """Initialize WarmCache
+
+        Args:
+            root (str): Directory all slots are kept in.
+            browser (str): Browser Name, slots are not shared between browsers.
+            max_bytes (int, optional): Size above which a slot's disk cache is emptied, the profile is not counted, also passed to the browser as its cache size. Defaults to 512 MiB.
+            max_age (float, optional): Seconds after which an unused slot is removed. Defaults to 7 days.
+            max_slots (Union[int, None], optional): Most slots handed out at the same time. Defaults to no limit.
+            cleanup_interval (float, optional): Seconds between two cleanups. Defaults to 3600.
+        """
+        self.directory = os.path.join(root, browser.lower())
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.max_slots = max_slots
+        self.cleanup_interval = cleanup_interval
+        os.makedirs(self.directory, exist_ok=True)
+        # open lock files of the slots this instance holds
+        self.locks = {}
+
+    def __try_lock(self, slot) -> bool:
+        # lock files are never removed, a removed file could be locked by one
+        # process while another creates and locks a new one
+        descriptor = os.open(slot + ".lock", os.O_CREAT | os.O_RDWR)
+        try:
+            if fcntl is not None:
+                fcntl.flock(descriptor, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                msvcrt.locking(descriptor, msvcrt.LK_NBLCK, 1)
+        except OSError:
+            os.close(descriptor)
+            return False
+        # who holds the slot, for whoever looks at the directory
+        os.ftruncate(descriptor, 0)
+        os.write(descriptor, "{} {}".format(
+            socket.gethostname(), os.getpid()).encode())
+        self.locks[slot] = descriptor
+        return True
+
+    def __unlock(self, slot):
+        descriptor = self.locks.pop(slot, None)
+        if descriptor is None:
+            return
+        if fcntl is not None:
+            fcntl.flock(descriptor, fcntl.LOCK_UN)
+        else:
+            os.lseek(descriptor, 0, os.SEEK_SET)
+            msvcrt.locking(descriptor, msvcrt.LK_UNLCK, 1)
+        os.close(descriptor)
+
+    def acquire(self) -> str:
+        """locks a free slot and returns its directory"""
+        self.cleanup()
+        number = 0
+        while self.max_slots is None or number < self.max_slots:
+            slot = os.path.join(self.directory, "slot-{}".format(number))
+            if self.__try_lock(slot):
+                os.makedirs(os.path.join(slot, "profile"), exist_ok=True)
+                os.makedirs(os.path.join(slot, "cache"), exist_ok=True)
+                return slot
+            number += 1
+        raise Exception("All {} cache slots are in use!".format(self.max_slots))
+
+    @staticmethod
+    def size_of(directory) -> int:
+        size = 0
+        for path, _, files in os.walk(directory):
+            for name in files:
+                try:
+                    size += os.path.getsize(os.path.join(path, name))
+                except OSError:
+                    pass
+        return size
+
+    def __prune(self, slot):
+        # only the disk cache counts, the profile is never emptied and would
+        # otherwise keep a slot over max_bytes for good
+        if WarmCache.size_of(os.path.join(slot, "cache")) > self.max_bytes:
+            logger.info("Emptying cache of {}".format(slot))
+            shutil.rmtree(os.path.join(slot, "cache"), ignore_errors=True)
+            os.makedirs(os.path.join(slot, "cache"), exist_ok=True)
+
+    def release(self, slot: str):
+        """unlocks a slot handed out by acquire, after the browser was closed"""
+        try:
+            self.__prune(slot)
+            os.utime(slot)
+        finally:
+            self.__unlock(slot)
+
+    def cleanup(self, force: bool = False):
+        """removes slots unused for max_age and empties oversized caches of
+        unlocked slots, unless the last cleanup was less than
+        cleanup_interval ago"""
+        marker = os.path.join(self.directory, ".last_cleanup")
+        now = time.time()
+        if not force and os.path.exists(marker) and now - os.path.getmtime(marker) < self.cleanup_interval:
+            return
+        with open(marker, "w", encoding="utf-8"):
+            pass
+        for name in os.listdir(self.directory):
+            slot = os.path.join(self.directory, name)
+            if not name.startswith("slot-") or name.endswith(".lock") or not os.path.isdir(slot):
+                continue
+            if not self.__try_lock(slot):
+                continue
+            try:
+                if now - os.path.getmtime(slot) > self.max_age:
+                    logger.info("Removing unused cache slot {}".format(slot))
+                    shutil.rmtree(slot, ignore_errors=True)
+                else:
+                    self.__prune(slot)
+            finally:
+                self.__unlock(slot)
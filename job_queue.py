@@ -0,0 +1,622 @@
+import os
+import hmac
+import json
+import time
+import logging
+import uuid
+import socket
+import sqlite3
+import argparse
+import threading
+import multiprocessing
+import requests
+from abc import ABC, abstractmethod
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Union
+from profile_info import Profile, logger
+from search_info import Search, run_search_job
+from browser_cache import WarmCache
+
+
+class QueueBackend(ABC):
+    """
+    Interface every job queue backend has to implement. A job is a plain
+    dictionary with the keys id, kind, payload, status, worker, attempts and
+    max_attempts.
+
+    Jobs move from "queued" to "leased" when a worker claims them, and from
+    "leased" to "done" or "failed". A leased job whose lease was not renewed
+    in time is handed back out to the next worker asking for work.
+    """
+
+    @abstractmethod
+    def put(self, kind: str, payload: dict, max_attempts: int = 3, job_id: Union[str, None] = None) -> str:
+        raise NotImplementedError
+
+    @abstractmethod
+    def claim(self, worker_id: str, lease_seconds: float) -> Union[dict, None]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def heartbeat(self, job_id: str, worker_id: str, lease_seconds: float) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    def complete(self, job_id: str, worker_id: str, result: Union[str, None] = None) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    def fail(self, job_id: str, worker_id: str, error: str) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    def requeue_expired(self) -> int:
+        raise NotImplementedError
+
+    @abstractmethod
+    def counts(self) -> dict:
+        raise NotImplementedError
+
+
+class SQLiteQueue(QueueBackend):
+    """Job queue stored in a single SQLite file. Every call opens its own
+    connection, so one instance can be shared between threads and every
+    process of the same host can point at the same file.
+
+    The file must stay on a local disk of one host: SQLite's WAL mode does
+    not work over a network filesystem, and lease expiry compares the clock
+    of whoever claims a job. Workers on other hosts reach the queue through
+    QueueServer and HTTPQueue instead."""
+
+    def __init__(self, path: str = "jobs.db", timeout: float = 30.0):
+        """Create the queue table if it does not exist yet
+
+        Args:
+            path (str, optional): Location of the SQLite database file. Defaults to "jobs.db".
+            timeout (float, optional): Seconds to wait for a lock held by another process. Defaults to 30.0.
+        """
+        self.path = path
+        self.timeout = timeout
+        conn = self.__connect()
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'queued',
+                worker TEXT,
+                lease_expires REAL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL DEFAULT 3,
+                result TEXT,
+                error TEXT,
+                created REAL NOT NULL,
+                updated REAL NOT NULL)""")
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, lease_expires)")
+        finally:
+            conn.close()
+
+    def __connect(self):
+        return sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+
+    @staticmethod
+    def __to_job(row) -> dict:
+        return {
+            "id": row[0],
+            "kind": row[1],
+            "payload": json.loads(row[2]),
+            "status": row[3],
+            "worker": row[4],
+            "attempts": row[5],
+            "max_attempts": row[6],
+        }
+
+    def put(self, kind, payload, max_attempts=3, job_id=None):
+        job_id = job_id or "{}-{}".format(kind, uuid.uuid4().hex)
+        now = time.time()
+        conn = self.__connect()
+        try:
+            conn.execute("INSERT OR IGNORE INTO jobs (id, kind, payload, max_attempts, created, updated) VALUES (?, ?, ?, ?, ?, ?)",
+                         (job_id, kind, json.dumps(payload), max_attempts, now, now))
+        finally:
+            conn.close()
+        return job_id
+
+    def claim(self, worker_id, lease_seconds):
+        now = time.time()
+        conn = self.__connect()
+        try:
+            # BEGIN IMMEDIATE takes the write lock up front, so two workers can
+            # never select the same row before one of them updates it
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("UPDATE jobs SET status = 'failed', error = 'lease expired', updated = ? "
+                         "WHERE status = 'leased' AND lease_expires < ? AND attempts >= max_attempts", (now, now))
+            row = conn.execute("SELECT id, kind, payload, status, worker, attempts, max_attempts FROM jobs "
+                               "WHERE status = 'queued' OR (status = 'leased' AND lease_expires < ?) "
+                               "ORDER BY created LIMIT 1", (now,)).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            if row[3] == 'leased':
+                logger.warning("Lease of job {} held by {} expired, handing it to {}".format(
+                    row[0], row[4], worker_id))
+            conn.execute("UPDATE jobs SET status = 'leased', worker = ?, lease_expires = ?, attempts = attempts + 1, updated = ? "
+                         "WHERE id = ?", (worker_id, now + lease_seconds, now, row[0]))
+            conn.execute("COMMIT")
+            job = self.__to_job(row)
+            job.update(status="leased", worker=worker_id,
+                       attempts=job["attempts"] + 1)
+            return job
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def __update_own_lease(self, query, params) -> bool:
+        conn = self.__connect()
+        try:
+            cursor = conn.execute(
+                query + " WHERE id = ? AND worker = ? AND status = 'leased'", params)
+            return cursor.rowcount == 1
+        finally:
+            conn.close()
+
+    def heartbeat(self, job_id, worker_id, lease_seconds):
+        now = time.time()
+        return self.__update_own_lease("UPDATE jobs SET lease_expires = ?, updated = ?",
+                                       (now + lease_seconds, now, job_id, worker_id))
+
+    def complete(self, job_id, worker_id, result=None):
+        return self.__update_own_lease("UPDATE jobs SET status = 'done', result = ?, lease_expires = NULL, updated = ?",
+                                       (result, time.time(), job_id, worker_id))
+
+    def fail(self, job_id, worker_id, error):
+        return self.__update_own_lease("UPDATE jobs SET status = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'queued' END, "
+                                       "error = ?, worker = NULL, lease_expires = NULL, updated = ?",
+                                       (error, time.time(), job_id, worker_id))
+
+    def requeue_expired(self):
+        now = time.time()
+        conn = self.__connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("UPDATE jobs SET status = 'failed', error = 'lease expired', updated = ? "
+                         "WHERE status = 'leased' AND lease_expires < ? AND attempts >= max_attempts", (now, now))
+            cursor = conn.execute("UPDATE jobs SET status = 'queued', worker = NULL, lease_expires = NULL, updated = ? "
+                                  "WHERE status = 'leased' AND lease_expires < ?", (now, now))
+            conn.execute("COMMIT")
+            return cursor.rowcount
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def counts(self):
+        conn = self.__connect()
+        try:
+            rows = conn.execute(
+                "SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        finally:
+            conn.close()
+        counts = {"queued": 0, "leased": 0, "done": 0, "failed": 0}
+        counts.update(dict(rows))
+        return counts
+
+
+# header carrying the shared secret of a QueueServer, and the environment
+# variable clients read it from when it is not passed
+TOKEN_HEADER = "X-Queue-Token"
+TOKEN_VARIABLE = "TWITTER_QUEUE_TOKEN"
+
+
+class QueueServer(ThreadingHTTPServer):
+    """Serves a queue over HTTP to the workers of other hosts. Every lease is
+    computed on this host only, so the clocks of the workers do not matter.
+
+    Jobs carry proxy credentials and paths that workers open with their
+    browser profiles, so every request has to send the shared token. Bind
+    to another interface than 127.0.0.1 only on a network you trust.
+
+    QueueServer(("127.0.0.1", 8700), SQLiteQueue("jobs.db"), token).serve_forever()
+    """
+
+    # request path to the queue method it calls
+    METHODS = ("put", "claim", "heartbeat", "complete",
+               "fail", "requeue_expired", "counts")
+
+    def __init__(self, address: tuple, queue: QueueBackend, token: str):
+        if not token:
+            raise Exception("QueueServer needs a token!")
+        self.queue = queue
+        self.token = token
+        super().__init__(address, QueueRequestHandler)
+
+
+class QueueRequestHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+    def do_POST(self):
+        method = self.path.strip("/")
+        if not hmac.compare_digest(self.headers.get(TOKEN_HEADER, "").encode(), self.server.token.encode()):  # type: ignore
+            logger.warning("Rejected {} from {}".format(
+                method, self.client_address[0]))
+            self.send_error(403)
+            return
+        if method not in QueueServer.METHODS:
+            self.send_error(404)
+            return
+        try:
+            arguments = json.loads(self.rfile.read(
+                int(self.headers.get("Content-Length", 0))) or b"{}")
+            result = getattr(self.server.queue, method)(**arguments)  # type: ignore
+            body = json.dumps({"result": result}).encode("utf-8")
+            self.send_response(200)
+        except Exception as ex:
+            logger.warning("Error at {} : {}".format(method, ex))
+            body = json.dumps({"error": repr(ex)}).encode("utf-8")
+            self.send_response(500)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class HTTPQueue(QueueBackend):
+    """Client of a QueueServer, for workers and coordinators on any host"""
+
+    def __init__(self, url: str, token: Union[str, None] = None, timeout: float = 30.0):
+        """Initialize HTTPQueue
+
+        Args:
+            url (str): Address of the QueueServer, for example http://10.0.0.5:8700.
+            token (Union[str, None], optional): Shared token of the QueueServer. Defaults to the TWITTER_QUEUE_TOKEN environment variable.
+            timeout (float, optional): Seconds to wait for the server to respond. Defaults to 30.0.
+        """
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers[TOKEN_HEADER] = token or os.environ.get(
+            TOKEN_VARIABLE, "")
+
+    def __call(self, method, **arguments):
+        response = self.session.post("{}/{}".format(self.url, method), json=arguments,
+                                     timeout=self.timeout)
+        if response.status_code == 403:
+            raise RuntimeError("Queue server rejected the token")
+        content = response.json()
+        if response.status_code != 200:
+            raise RuntimeError("Queue server failed at {} : {}".format(
+                method, content.get("error")))
+        return content["result"]
+
+    def put(self, kind, payload, max_attempts=3, job_id=None):
+        return self.__call("put", kind=kind, payload=payload, max_attempts=max_attempts, job_id=job_id)
+
+    def claim(self, worker_id, lease_seconds):
+        return self.__call("claim", worker_id=worker_id, lease_seconds=lease_seconds)
+
+    def heartbeat(self, job_id, worker_id, lease_seconds):
+        return self.__call("heartbeat", job_id=job_id, worker_id=worker_id, lease_seconds=lease_seconds)
+
+    def complete(self, job_id, worker_id, result=None):
+        return self.__call("complete", job_id=job_id, worker_id=worker_id, result=result)
+
+    def fail(self, job_id, worker_id, error):
+        return self.__call("fail", job_id=job_id, worker_id=worker_id, error=error)
+
+    def requeue_expired(self):
+        return self.__call("requeue_expired")
+
+    def counts(self):
+        return self.__call("counts")
+
+
+def open_queue(location: str, token: Union[str, None] = None) -> QueueBackend:
+    """returns an HTTPQueue for http(s) URLs and a SQLiteQueue for file paths"""
+    if location.startswith(("http://", "https://")):
+        return HTTPQueue(location, token)
+    return SQLiteQueue(location)
+
+
+class DirectorySink:
+    """Writes the result of every job to its own <job_id>.json file. The file
+    is written under a temporary name and renamed, so a reader never sees a
+    half written result and a re-run of the same job simply replaces it."""
+
+    def __init__(self, directory: str = os.getcwd()):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def write(self, job: dict, data: dict) -> str:
+        location = os.path.join(self.directory, "{}.json".format(job["id"]))
+        temporary_location = "{}.{}.tmp".format(location, os.getpid())
+        with open(temporary_location, "w", encoding="utf-8") as file:
+            json.dump(data, file, ensure_ascii=False)
+        os.replace(temporary_location, location)
+        return location
+
+    def merge(self) -> dict:
+        """reads all job results of the directory into one dictionary, tweets
+        found by several jobs are kept once"""
+        data = {}
+        for name in sorted(os.listdir(self.directory)):
+            if name.endswith(".json"):
+                with open(os.path.join(self.directory, name), encoding="utf-8") as file:
+                    data.update(json.load(file))
+        return data
+
+
+def run_profile_job(payload: dict) -> dict:
+    """Scrapes the profile described by a "profile" job payload"""
+    warm_cache = None
+    if payload.get("warm_cache"):
+        warm_cache = WarmCache(payload["warm_cache"],
+                               payload.get("browser", "firefox"))
+    profile_bot = Profile(payload["twitter_username"], payload.get("browser", "firefox"), payload.get("proxy"),
+                          payload.get("tweets_count", 30), payload.get("headless", True), payload.get("browser_profile"),
+                          warm_cache=warm_cache)
+    data = profile_bot.scrap()
+    if data is None:
+        raise RuntimeError("Failed to scrape {}".format(
+            payload["twitter_username"]))
+    return data
+
+
+# maps the kind of a job to the function that runs its payload
+JOB_HANDLERS = {
+    "profile": run_profile_job,
+    "search": run_search_job,
+}
+
+
+class Worker:
+    """Claims jobs from the queue one at a time, runs them and hands the result
+    to the sink. While a job runs a background thread keeps renewing its
+    lease, so only the jobs in flight are lost when the worker dies."""
+
+    def __init__(self, queue: QueueBackend, sink, worker_id: Union[str, None] = None, lease_seconds: float = 300,
+                 heartbeat_interval: Union[float, None] = None, poll_interval: float = 5, handlers: Union[dict, None] = None):
+        """Initialize Worker
+
+        Args:
+            queue (QueueBackend): Queue to take jobs from.
+            sink: Object with a write(job, data) method that stores the result of a job and returns its location.
+            worker_id (Union[str, None], optional): Name of the worker in the queue. Defaults to hostname-pid.
+            lease_seconds (float, optional): How long a claimed job stays reserved without a heartbeat. Defaults to 300.
+            heartbeat_interval (Union[float, None], optional): Seconds between lease renewals. Defaults to a third of lease_seconds.
+            poll_interval (float, optional): Seconds to wait before asking again when the queue is empty. Defaults to 5.
+            handlers (Union[dict, None], optional): Mapping of job kind to handler function. Defaults to JOB_HANDLERS.
+        """
+        self.queue = queue
+        self.sink = sink
+        self.worker_id = worker_id or "{}-{}".format(
+            socket.gethostname(), os.getpid())
+        self.lease_seconds = lease_seconds
+        self.heartbeat_interval = heartbeat_interval or lease_seconds / 3
+        self.poll_interval = poll_interval
+        self.handlers = handlers if handlers is not None else JOB_HANDLERS
+
+    def __keep_lease(self, job_id, stop, lost):
+        while not stop.wait(self.heartbeat_interval):
+            try:
+                if not self.queue.heartbeat(job_id, self.worker_id, self.lease_seconds):
+                    logger.warning(
+                        "Lost lease of job {}".format(job_id))
+                    lost.set()
+                    return
+            except Exception as ex:
+                logger.warning("Error at heartbeat : {}".format(ex))
+
+    def run_once(self) -> bool:
+        """claims and runs a single job, returns False if there was nothing to claim"""
+        job = self.queue.claim(self.worker_id, self.lease_seconds)
+        if job is None:
+            return False
+        stop, lost = threading.Event(), threading.Event()
+        heartbeat = threading.Thread(target=self.__keep_lease, args=(
+            job["id"], stop, lost), daemon=True)
+        heartbeat.start()
+        try:
+            handler = self.handlers[job["kind"]]
+            data = handler(job["payload"])
+            if lost.is_set():
+                return True
+            location = self.sink.write(job, data)
+            self.queue.complete(job["id"], self.worker_id, location)
+            logger.info("Job {} done, saved to {}".format(job["id"], location))
+        except Exception as ex:
+            logger.exception("Error at job {} : {}".format(job["id"], ex))
+            self.queue.fail(job["id"], self.worker_id, repr(ex))
+        finally:
+            stop.set()
+            heartbeat.join()
+        return True
+
+    def run(self, max_jobs: Union[int, None] = None, exit_when_empty: bool = False) -> int:
+        """Runs jobs until max_jobs were processed, or until no job is queued or
+        leased anymore if exit_when_empty is set. Returns the number of jobs run.
+        """
+        logger.setLevel(logging.INFO)
+        processed = 0
+        while max_jobs is None or processed < max_jobs:
+            if self.run_once():
+                processed += 1
+                continue
+            if exit_when_empty:
+                counts = self.queue.counts()
+                # leased jobs of other workers may still come back if they die
+                if counts["queued"] == 0 and counts["leased"] == 0:
+                    break
+            time.sleep(self.poll_interval)
+        return processed
+
+
+
+class Coordinator:
+    """Submits jobs and watches over the queue until all of them finished"""
+
+    def __init__(self, queue: QueueBackend):
+        self.queue = queue
+
+    def submit_profiles(self, usernames: list, max_attempts: int = 3, **options) -> list:
+        """Queues one "profile" job per username
+
+        Args:
+            usernames (list): Twitter usernames to scrape.
+            max_attempts (int, optional): How often a job is tried before it is marked failed. Defaults to 3.
+            **options: browser, proxy, tweets_count, headless, browser_profile and warm_cache, passed to every job.
+
+        Returns:
+            list: ids of the queued jobs
+        """
+        job_ids = []
+        for username in usernames:
+            payload = dict(options, twitter_username=username)
+            job_ids.append(self.queue.put(
+                "profile", payload, max_attempts=max_attempts))
+        return job_ids
+
+    def submit_search(self, keyword: str, since: str, until: str, shards: int = 8, max_attempts: int = 3, **options) -> list:
+        """Queues one "search" job per date window, so the windows of a long
+        date range are scraped by all nodes
+
+        Args:
+            keyword (str): Keyword to search on twitter, use from:username for the tweets of an account.
+            since (str): First day to search, format is YYYY-MM-DD.
+            until (str): Day after the last day to search, format is YYYY-MM-DD.
+            shards (int, optional): Number of windows, and therefore jobs. Defaults to 8.
+            max_attempts (int, optional): How often a job is tried before it is marked failed. Defaults to 3.
+            **options: proxy, workers and max_pages_per_window, passed to every job.
+
+        Returns:
+            list: ids of the queued jobs
+        """
+        job_ids = []
+        search_bot = Search(keyword, since, until)
+        for window_since, window_until in Search.split_date_range(search_bot.since, search_bot.until, shards):
+            payload = dict(options, keyword=keyword, since=window_since.isoformat(),
+                           until=window_until.isoformat())
+            job_ids.append(self.queue.put(
+                "search", payload, max_attempts=max_attempts))
+        return job_ids
+
+    def wait(self, poll_interval: float = 5, timeout: Union[float, None] = None) -> dict:
+        """Re-queues jobs of dead workers until nothing is queued or leased
+        anymore and returns the final job counts"""
+        started = time.time()
+        while True:
+            requeued = self.queue.requeue_expired()
+            if requeued:
+                logger.warning("Re-queued {} expired jobs".format(requeued))
+            counts = self.queue.counts()
+            if counts["queued"] == 0 and counts["leased"] == 0:
+                return counts
+            if timeout is not None and time.time() - started > timeout:
+                return counts
+            time.sleep(poll_interval)
+
+
+def _worker_process(queue_location, token, directory, worker_options):
+    worker = Worker(open_queue(queue_location, token), DirectorySink(directory), **worker_options)
+    worker.run(exit_when_empty=True)
+
+
+def run_workers(queue_location: str = "jobs.db", directory: str = os.getcwd(), processes: int = 2,
+                token: Union[str, None] = None, **worker_options) -> dict:
+    """Starts local worker processes and waits until the queue is drained.
+
+    Args:
+        queue_location (str, optional): Path of a SQLite queue on this host, or URL of a QueueServer. Defaults to "jobs.db".
+        directory (str, optional): Directory the job results are written to. Defaults to os.getcwd().
+        processes (int, optional): Number of worker processes. Defaults to 2.
+        token (Union[str, None], optional): Shared token if queue_location is the URL of a QueueServer. Defaults to the TWITTER_QUEUE_TOKEN environment variable.
+        **worker_options: lease_seconds, heartbeat_interval, poll_interval and handlers, passed to every Worker.
+
+    Returns:
+        dict: job counts by status once all workers exited
+    """
+    workers = [multiprocessing.Process(target=_worker_process, args=(queue_location, token, directory, worker_options))
+               for _ in range(processes)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return Coordinator(open_queue(queue_location, token)).wait(timeout=0)
+
+
+def main(argv: Union[list, None] = None, handlers: Union[dict, None] = None):
+    parser = argparse.ArgumentParser(
+        description="Scrape twitter profiles with a shared job queue")
+    parser.add_argument("--queue", "--db", dest="queue", default="jobs.db",
+                        help="path of the SQLite job queue on this host, or URL of a queue server")
+    parser.add_argument("--token", default=os.environ.get(TOKEN_VARIABLE),
+                        help="shared token of the queue server, defaults to ${}".format(TOKEN_VARIABLE))
+    commands = parser.add_subparsers(dest="command", required=True)
+    submit = commands.add_parser("submit", help="queue profiles for scraping")
+    submit.add_argument("usernames", nargs="+")
+    submit.add_argument("--browser", default="firefox")
+    submit.add_argument("--tweets-count", type=int, default=30)
+    submit.add_argument("--proxy", default=None)
+    submit.add_argument("--max-attempts", type=int, default=3)
+    submit.add_argument("--warm-cache", default=None,
+                        help="directory for reusable browser profiles and caches on every node")
+    submit_search = commands.add_parser(
+        "submit-search", help="queue the date windows of a search for scraping")
+    submit_search.add_argument("keyword")
+    submit_search.add_argument("--since", required=True)
+    submit_search.add_argument("--until", required=True)
+    submit_search.add_argument("--shards", type=int, default=8)
+    submit_search.add_argument("--proxy", default=None)
+    submit_search.add_argument("--max-attempts", type=int, default=3)
+    worker = commands.add_parser("worker", help="run jobs from the queue")
+    worker.add_argument("--directory", default=os.getcwd())
+    worker.add_argument("--processes", type=int, default=1)
+    worker.add_argument("--lease-seconds", type=float, default=300)
+    commands.add_parser("status", help="print job counts")
+    serve = commands.add_parser(
+        "serve", help="serve the SQLite queue to the workers of other hosts")
+    serve.add_argument("--host", default="127.0.0.1",
+                       help="interface to listen on, pass 0.0.0.0 to accept the workers of other hosts")
+    serve.add_argument("--port", type=int, default=8700)
+    args = parser.parse_args(argv)
+
+    queue = open_queue(args.queue, args.token)
+    if args.command == "serve":
+        if not isinstance(queue, SQLiteQueue):
+            parser.error("serve needs the path of a SQLite queue")
+        if not args.token:
+            parser.error("serve needs --token or ${}".format(TOKEN_VARIABLE))
+        logger.setLevel(logging.INFO)
+        logger.info("Serving {} on {}:{}".format(
+            args.queue, args.host, args.port))
+        QueueServer((args.host, args.port), queue,
+                    args.token).serve_forever()
+    elif args.command == "submit":
+        job_ids = Coordinator(queue).submit_profiles(args.usernames, max_attempts=args.max_attempts,
+                                                     browser=args.browser, tweets_count=args.tweets_count, proxy=args.proxy,
+                                                     warm_cache=args.warm_cache)
+        print("\n".join(job_ids))
+    elif args.command == "submit-search":
+        job_ids = Coordinator(queue).submit_search(args.keyword, args.since, args.until, args.shards,
+                                                   max_attempts=args.max_attempts, proxy=args.proxy)
+        print("\n".join(job_ids))
+    elif args.command == "worker":
+        worker_options: dict = {"lease_seconds": args.lease_seconds}
+        if handlers is not None:
+            worker_options["handlers"] = handlers
+        print(json.dumps(run_workers(args.queue, args.directory,
+                                     args.processes, args.token, **worker_options)))
+    else:
+        queue.requeue_expired()
+        print(json.dumps(queue.counts()))
+
+
+if __name__ == "__main__":
+    main()
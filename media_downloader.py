@@ -0,0 +1,225 @@
+import os
+import json
+import time
+import hashlib
+import tempfile
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Union
+from profile_info import logger
+
+try:
+    import fcntl
+except ImportError:
+    # windows
+    fcntl = None
+    import msvcrt
+
+
+# leading bytes of the formats twitter serves, the extension of a stored file
+# is taken from its content so the same bytes get the same name whatever
+# the URL looked like
+SIGNATURES = [
+    (0, b"\xff\xd8\xff", ".jpg"),
+    (0, b"\x89PNG\r\n\x1a\n", ".png"),
+    (0, b"GIF8", ".gif"),
+    (8, b"WEBP", ".webp"),
+    (4, b"ftyp", ".mp4"),
+]
+
+class MediaDownloader:
+    """
+    Downloads the images, videos and profile pictures of scraped tweets in a
+    pool of threads sharing one connection pool. Files are stored by the
+    SHA-256 of their content under objects/, with the extension of the format
+    found in the content, and index.json maps every URL to its file, so a URL
+    is only downloaded once across runs and identical files are only stored
+    once. The index is saved every save_interval seconds while downloading,
+    so an interrupted run keeps most of it, and scrapers sharing the
+    directory merge their entries into it under a lock on index.json.lock.
+
+    with MediaDownloader("./Output/media") as downloader:
+        downloader.submit_record(tweet)
+    """
+
+    def __init__(self, directory: str, workers: int = 8, chunk_size: int = 64 * 1024, max_pending: Union[int, None] = None,
+                 proxy: Union[str, None] = None, timeout: float = 30, save_interval: float = 30):
+        """Initialize MediaDownloader
+
+        Args:
+            directory (str): Directory the media and the index are stored in.
+            workers (int, optional): Number of downloads running at the same time. Defaults to 8.
+            chunk_size (int, optional): Bytes read from the connection before they are written to disk. Defaults to 64 KiB.
+            max_pending (Union[int, None], optional): Number of queued downloads after which submit blocks. Defaults to 4 times workers.
+            proxy (Union[str, None], optional): Optional parameter, if user wants to use proxy for downloading. Format is username:password@host:port. Defaults to None.
+            timeout (float, optional): Seconds to wait for the server to respond. Defaults to 30.
+            save_interval (float, optional): Seconds between two saves of the index while downloading. Defaults to 30.
+        """
+        self.directory = directory
+        self.chunk_size = chunk_size
+        self.timeout = timeout
+        self.save_interval = save_interval
+        self.last_save = time.time()
+        self.index_location = os.path.join(directory, "index.json")
+        os.makedirs(os.path.join(directory, "objects"), exist_ok=True)
+        self.index = self.__load_index()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        if proxy:
+            self.session.proxies = {
+                "http": "http://{}".format(proxy),
+                "https": "http://{}".format(proxy)
+            }
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.pending_slots = threading.BoundedSemaphore(
+            max_pending or workers * 4)
+        self.lock = threading.Lock()
+        self.save_lock = threading.Lock()
+        self.in_flight = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __load_index(self) -> dict:
+        try:
+            with open(self.index_location, encoding="utf-8") as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return {}
+        except ValueError:
+            logger.warning('Invalid JSON Detected!')
+            return {}
+
+    def save_index(self):
+        """writes the URL index, under a temporary name first so an interrupted
+        write never destroys the old index. Entries another downloader saved
+        to the same directory in the meantime are merged in, not dropped."""
+        with self.save_lock, open(self.index_location + ".lock", "a") as lock_file:
+            # other processes sharing the directory wait until this merge is written
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            else:
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+            saved_index = self.__load_index()
+            with self.lock:
+                for url, relative_location in saved_index.items():
+                    self.index.setdefault(url, relative_location)
+                index = dict(self.index)
+                self.last_save = time.time()
+            descriptor, temporary_location = tempfile.mkstemp(
+                suffix=".tmp", dir=self.directory)
+            try:
+                with os.fdopen(descriptor, "w", encoding="utf-8") as file:
+                    json.dump(index, file)
+                os.chmod(temporary_location, 0o644)
+                os.replace(temporary_location, self.index_location)
+            except BaseException:
+                os.remove(temporary_location)
+                raise
+
+    @staticmethod
+    def sniff_extension(head: bytes) -> str:
+        """finds the file extension from the first bytes of the file, files of
+        an unknown format get none"""
+        for offset, signature, extension in SIGNATURES:
+            if head[offset:offset + len(signature)] == signature:
+                return extension
+        return ""
+
+    def location_of(self, url) -> Union[str, None]:
+        """returns where the file of the URL is stored, if it was downloaded"""
+        relative_location = self.index.get(url)
+        if relative_location:
+            return os.path.join(self.directory, relative_location)
+        return None
+
+    def download(self, url) -> Union[str, None]:
+        """downloads the URL in chunks while hashing it, and returns the location
+        of the stored file"""
+        temporary_location = None
+        try:
+            with self.session.get(url, stream=True, timeout=self.timeout) as response:
+                if response.status_code != 200:
+                    logger.warning("Error at download : {} returned {}".format(
+                        url, response.status_code))
+                    return None
+                digest = hashlib.sha256()
+                head = b""
+                descriptor, temporary_location = tempfile.mkstemp(
+                    suffix=".part", dir=os.path.join(self.directory, "objects"))
+                with os.fdopen(descriptor, "wb") as file:
+                    for chunk in response.iter_content(chunk_size=self.chunk_size):
+                        if len(head) < 16:
+                            head += chunk[:16]
+                        digest.update(chunk)
+                        file.write(chunk)
+                content_hash = digest.hexdigest()
+                relative_location = os.path.join("objects", content_hash[:2], content_hash +
+                                                 MediaDownloader.sniff_extension(head))
+            location = os.path.join(self.directory, relative_location)
+            os.makedirs(os.path.dirname(location), exist_ok=True)
+            if os.path.exists(location):
+                # same content under another URL, keep the stored copy
+                os.remove(temporary_location)
+            else:
+                # mkstemp creates the file readable by its owner only
+                os.chmod(temporary_location, 0o644)
+                os.replace(temporary_location, location)
+            temporary_location = None
+            with self.lock:
+                self.index[url] = relative_location
+                save_due = time.time() - self.last_save >= self.save_interval
+            if save_due:
+                try:
+                    self.save_index()
+                except OSError as ex:
+                    # the file is stored, the next save writes its entry
+                    logger.warning("Error at save_index : {}".format(ex))
+            return location
+        except Exception as ex:
+            logger.warning("Error at download : {}".format(ex))
+        finally:
+            if temporary_location and os.path.exists(temporary_location):
+                os.remove(temporary_location)
+
+    def __release(self, url, future):
+        with self.lock:
+            self.in_flight.pop(url, None)
+        self.pending_slots.release()
+
+    def submit(self, url) -> Union[Future, None]:
+        """queues the URL for download, unless it is already downloaded or
+        queued. Blocks while max_pending downloads are waiting."""
+        if not url or not url.startswith(("http://", "https://")):
+            return None
+        with self.lock:
+            if url in self.index or url in self.in_flight:
+                return self.in_flight.get(url)
+        self.pending_slots.acquire()
+        with self.lock:
+            if url in self.index or url in self.in_flight:
+                self.pending_slots.release()
+                return self.in_flight.get(url)
+            future = self.executor.submit(self.download, url)
+            self.in_flight[url] = future
+        future.add_done_callback(lambda done: self.__release(url, done))
+        return future
+
+    def submit_record(self, record: dict):
+        """queues the profile picture, images and videos of a tweet record"""
+        self.submit(record.get("profile_picture"))
+        for url in (record.get("images") or []) + (record.get("videos") or []):
+            self.submit(url)
+
+    def close(self):
+        """waits for all queued downloads and saves the index"""
+        self.executor.shutdown(wait=True)
+        self.session.close()
+        self.save_index()
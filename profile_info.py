@@ -1,5 +1,9 @@
 import re
+import io
 import json
+import base64
+import hashlib
+import pkgutil
 import requests
 import time
 import csv
@@ -25,7 +29,13 @@ from random import randint
 from dateutil.parser import parse
 from urllib.parse import quote
 from typing import Union
+from cryptography import x509
+from cryptography.hazmat.primitives import serialization
 
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
 
 
 logger = logging.getLogger(__name__)
@@ -35,8 +45,12 @@ ch = logging.StreamHandler()
 ch.setFormatter(format)
 logger.addHandler(ch)
 
+# public bearer token the twitter web client sends with every API request
+AUTHORIZATION_KEY = 'Bearer AAAAAAAAAAAAAAAAAAAAANRILgAAAAAAnNwIzUejRCOuH5E6I8xnZz4puTs%3D1Zv7ttfk8LF81IUq16cHjhLTvJu4FA33AGWWjCpTnA'
+
 class Initializer:
-    def __init__(self, browser_name: str, headless: bool, proxy: Union[str, None] = None, profile: Union[str, None] = None):
+    def __init__(self, browser_name: str, headless: bool, proxy: Union[str, None] = None, profile: Union[str, None] = None,
+                 cache_dir: Union[str, None] = None, cache_size: Union[int, None] = None):
         """Initialize Browser
 
         Args:
@@ -44,11 +58,62 @@ class Initializer:
             headless (bool): Whether to run Browser in headless mode?
             proxy (Union[str, None], optional): Optional parameter, if user wants to use proxy for scraping. If the proxy is authenticated proxy then the proxy format is username:password@host:port. Defaults to None.
             profile (Union[str, None], optional): Path of Browser Profile where cookies might be located to scrap data in authenticated way. Defaults to None.
+            cache_dir (Union[str, None], optional): Slot directory from WarmCache.acquire, the browser keeps its profile and disk cache there between runs. Defaults to None.
+            cache_size (Union[int, None], optional): Size of the browser's disk cache in bytes when cache_dir is passed. Defaults to None.
       """
         self.browser_name = browser_name
         self.proxy = proxy
         self.headless = headless
         self.profile = profile
+        self.cache_dir = cache_dir
+        self.cache_size = cache_size
+
+    @staticmethod
+    def find_proxy_spki() -> Union[str, None]:
+        """returns the base64 SHA-256 of the public key of selenium-wire's root
+        certificate, which its certificates for every host share"""
+        try:
+            certificate = x509.load_pem_x509_certificate(
+                pkgutil.get_data("seleniumwire", "ca.crt"))  # type: ignore
+            public_key = certificate.public_key().public_bytes(
+                serialization.Encoding.DER, serialization.PublicFormat.SubjectPublicKeyInfo)
+            return base64.b64encode(hashlib.sha256(public_key).digest()).decode()
+        except Exception as ex:
+            logger.warning("Error at find_proxy_spki : {}".format(ex))
+
+    def set_cache_properties(self, browser_option):
+        """keeps profile and disk cache of the browser in the cache_dir slot"""
+        profile = self.profile or os.path.join(self.cache_dir, "profile")  # type: ignore
+        cache = os.path.join(self.cache_dir, "cache")  # type: ignore
+        if self.browser_name.lower() in ("chrome", "edge"):
+            if not self.profile:
+                browser_option.add_argument(
+                    "--user-data-dir={}".format(profile))
+            browser_option.add_argument("--disk-cache-dir={}".format(cache))
+            # every response passes selenium-wire's proxy, and chromium never
+            # caches responses it only accepted through --ignore-certificate-errors.
+            # Certificates with this key verify as valid instead, so they are
+            # cached. Chromium only reads the list together with --user-data-dir.
+            spki = Initializer.find_proxy_spki()
+            if spki:
+                browser_option.add_argument(
+                    "--ignore-certificate-errors-spki-list={}".format(spki))
+            if self.cache_size:
+                browser_option.add_argument(
+                    "--disk-cache-size={}".format(self.cache_size))
+        elif self.browser_name.lower() == "firefox":
+            if not self.profile:
+                browser_option.add_argument("-profile")
+                browser_option.add_argument(profile)
+            browser_option.set_preference("browser.cache.disk.enable", True)
+            browser_option.set_preference(
+                "browser.cache.disk.parent_directory", cache)
+            if self.cache_size:
+                browser_option.set_preference(
+                    "browser.cache.disk.smart_size.enabled", False)
+                browser_option.set_preference(
+                    "browser.cache.disk.capacity", self.cache_size // 1024)
+        return browser_option
 
     def set_properties(self, browser_option):
         """adds capabilities to the driver"""
@@ -78,6 +143,8 @@ class Initializer:
         browser_option.add_argument('--disable-notifications')
         browser_option.add_argument('--disable-popup-blocking')
         browser_option.add_argument('--user-agent={}'.format(header))
+        if self.cache_dir:
+            self.set_cache_properties(browser_option)
         return browser_option
 
     def set_driver_for_browser(self, browser_name: str):
@@ -178,6 +245,27 @@ class Scraping_utilities:
     def set_value_or_none(value, string) -> Union[str, None]:
         return string+str(value)+" " if value is not None else None
 
+    @staticmethod
+    def build_search_query(keyword: str, since: Union[int, str, None] = None, until: Union[int, str, None] = None,
+                           since_id: Union[int, None] = None, max_id: Union[int, None] = None,
+                           within_time: Union[str, None] = None) -> str:
+        """Builds the twitter search query for passed keyword, the arguments are the same as for url_generator"""
+        if within_time is None:
+            words = [Scraping_utilities.set_value_or_none(since, "since:"),
+                     Scraping_utilities.set_value_or_none(
+                until, "until:"),
+                Scraping_utilities.set_value_or_none(
+                since_id, "since_id:"), Scraping_utilities.set_value_or_none(max_id, "max_id:")]
+            query = ""
+            for word in words:
+                if word is not None:
+                    query += word
+            query += keyword
+            return query
+        word = Scraping_utilities.set_value_or_none(
+            within_time, "within_time:")
+        return keyword + " " + word  # type: ignore
+
     @staticmethod
     def url_generator(keyword: str, since: Union[int, None] = None, until: Union[str, None] = None,
                       since_id: Union[int, None] = None, max_id: Union[int, None] = None,
@@ -196,25 +284,56 @@ class Scraping_utilities:
             str: Twitter URL
         """
         base_url = "https://twitter.com/search?q="
-        if within_time is None:
-            words = [Scraping_utilities.set_value_or_none(since, "since:"),
-                     Scraping_utilities.set_value_or_none(
-                until, "until:"),
-                Scraping_utilities.set_value_or_none(
-                since_id, "since_id:"), Scraping_utilities.set_value_or_none(max_id, "max_id:")]
-            query = ""
-            for word in words:
-                if word is not None:
-                    query += word
-            query += keyword
-            query = quote(query)
-            base_url = base_url + query + "&src=typed_query&f=live"
-        else:
-            word = Scraping_utilities.set_value_or_none(
-                within_time, "within_time:")
-            query = keyword + " " + word  # type: ignore
-            base_url = base_url + quote(query) + "&src=typed_query&f=live"
-        return base_url
+        query = Scraping_utilities.build_search_query(
+            keyword, since, until, since_id, max_id, within_time)
+        return base_url + quote(query) + "&src=typed_query&f=live"
+
+    @staticmethod
+    def build_tweet_record(tweet_id, legacy: dict, user: dict, retweet_link: str = "") -> dict:
+        """Converts a tweet object of the twitter API and its author to the
+        record that scrape_profile writes
+
+        Args:
+            tweet_id: Id of the tweet.
+            legacy (dict): Tweet object, as found in search results or in the legacy key of GraphQL results.
+            user (dict): User object of the author.
+            retweet_link (str, optional): Link to the retweeted tweet if this is a retweet. Defaults to "".
+
+        Returns:
+            dict: tweet record
+        """
+        username = user["screen_name"]
+        entities = legacy.get("entities", {})
+        media = legacy.get("extended_entities", {}).get("media", [])
+        images = [item["media_url_https"]
+                  for item in media if item.get("type") == "photo"]
+        videos = []
+        for item in media:
+            variants = [variant for variant in item.get("video_info", {}).get("variants", [])
+                        if variant.get("content_type") == "video/mp4"]
+            if variants:
+                videos.append(
+                    max(variants, key=lambda variant: variant.get("bitrate", 0))["url"])
+        urls = entities.get("urls", [])
+        return {
+            "tweet_id": str(tweet_id),
+            "username": username,
+            "name": user.get("name"),
+            "profile_picture": user.get("profile_image_url_https"),
+            "replies": legacy.get("reply_count"),
+            "retweets": legacy.get("retweet_count"),
+            "likes": legacy.get("favorite_count"),
+            "is_retweet": retweet_link != "",
+            "retweet_link": retweet_link,
+            "posted_time": parse(legacy["created_at"]).isoformat(),
+            "content": legacy.get("full_text", ""),
+            "hashtags": [hashtag["text"] for hashtag in entities.get("hashtags", [])],
+            "mentions": [mention["screen_name"] for mention in entities.get("user_mentions", [])],
+            "images": images,
+            "videos": videos,
+            "tweet_url": "https://twitter.com/{}/status/{}".format(username, tweet_id),
+            "link": urls[0].get("expanded_url", "") if urls else ""
+        }
 
     @staticmethod
     def make_http_request_with_params(URL, params, headers, proxy=None):
@@ -294,6 +413,16 @@ class Scraping_utilities:
             params['cursor'] = cursor
         return params
 
+    @staticmethod
+    def build_search_params(query, cursor=None):
+        """parameters of a typed search on the Latest tab, results come
+        newest first instead of ranked like a trend click"""
+        params = Scraping_utilities.build_params(query, cursor)
+        del params['vertical']
+        params['query_source'] = 'typed_query'
+        params['tweet_search_mode'] = 'live'
+        return params
+
     @staticmethod
     def build_keyword_headers(x_guest_token, authorization_key, query=None):
         headers = {
@@ -386,7 +515,8 @@ class Utilities:
         slow internet connection issues
         """
         try:
-            WebDriverWait(driver, 10).until(EC.presence_of_element_located(
+            # drivers that do not load anything, like ReplayDriver, set a shorter timeout
+            WebDriverWait(driver, getattr(driver, "wait_timeout", 10)).until(EC.presence_of_element_located(
                 (By.CSS_SELECTOR, '[data-testid="tweet"]')))
         except WebDriverException:
             logger.exception(
@@ -407,8 +537,10 @@ class Utilities:
         """waits until the page have completed loading"""
         try:
             state = ""
+            # drivers that do not load anything, like ReplayDriver, set a shorter delay
+            delay = getattr(driver, "page_load_delay", (3, 5))
             while state != "complete":
-                time.sleep(randint(3, 5))
+                time.sleep(randint(*delay))
                 state = driver.execute_script("return document.readyState")
         except Exception as ex:
             logger.exception('Error at wait_until_completion: {}'.format(ex))
@@ -625,10 +757,13 @@ class Profile:
     """this class needs to be instantiated in order to scrape post of some
     twitter profile"""
 
-    def __init__(self, twitter_username, browser, proxy, tweets_count, headless, browser_profile):
+    def __init__(self, twitter_username, browser, proxy, tweets_count, headless, browser_profile, on_tweet=None,
+                 driver=None, known_tweets=None, known_overlap=3, warm_cache=None, recorder=None):
         self.twitter_username = twitter_username
         self.URL = "https://twitter.com/{}".format(twitter_username.lower())
-        self.__driver = ""
+        self.__driver = driver or ""
+        # a driver passed in belongs to the caller, who keeps it open
+        self.__keep_driver = driver is not None
         self.browser = browser
         self.proxy = proxy
         self.tweets_count = tweets_count
@@ -636,15 +771,43 @@ class Profile:
         self.retry = 20
         self.headless = headless
         self.browser_profile = browser_profile
+        # called with every new tweet record while the profile is still scrolled
+        self.on_tweet = on_tweet
+        # scrolling stops once known_overlap of these tweet ids were found again
+        self.known_tweets = set(known_tweets or [])
+        self.known_overlap = known_overlap
+        # WarmCache handing out a reusable profile and disk cache for the driver
+        self.warm_cache = warm_cache
+        self.__cache_slot = None
+        # ScrapeRecorder saving the timeline after every scroll step
+        self.recorder = recorder
 
     def __start_driver(self):
         """changes the class member __driver value to driver on call"""
+        if self.__keep_driver:
+            return
+        cache_size = None
+        if self.warm_cache is not None:
+            self.__cache_slot = self.warm_cache.acquire()
+            cache_size = self.warm_cache.max_bytes
         self.__driver = Initializer(
-            self.browser, self.headless, self.proxy, self.browser_profile).init()
+            self.browser, self.headless, self.proxy, self.browser_profile, self.__cache_slot, cache_size).init()
 
     def __close_driver(self):
-        self.__driver.close()  # type: ignore
-        self.__driver.quit() # type: ignore
+        if self.__keep_driver:
+            return
+        try:
+            self.__driver.close()  # type: ignore
+            self.__driver.quit() # type: ignore
+        finally:
+            if self.__cache_slot is not None:
+                self.warm_cache.release(self.__cache_slot)  # type: ignore
+                self.__cache_slot = None
+
+    def __reached_known_tweets(self):
+        if not self.known_tweets:
+            return False
+        return len(self.known_tweets.intersection(self.posts_data)) >= min(self.known_overlap, len(self.known_tweets))
 
     def __check_tweets_presence(self, tweet_list):
         if len(tweet_list) <= 0:
@@ -680,6 +843,7 @@ class Profile:
                     mentions = re.findall(r"@(\w+)", content) # type: ignore
                     profile_picture = Finder.find_profile_image_link(tweet)
                     link = Finder.find_external_link(tweet)
+                    is_new = status not in self.posts_data
                     self.posts_data[status] = {
                         "tweet_id": status,
                         "username": username,
@@ -699,10 +863,16 @@ class Profile:
                         "tweet_url": tweet_url,
                         "link": link
                     }
+                    if is_new and self.on_tweet is not None:
+                        self.on_tweet(self.posts_data[status])
 
+                if self.__reached_known_tweets():
+                    break
                 Utilities.scroll_down(self.__driver)
                 Utilities.wait_until_completion(self.__driver)
                 Utilities.wait_until_tweets_appear(self.__driver)
+                if self.recorder is not None:
+                    self.recorder.capture(self.__driver)
                 present_tweets = Finder.find_all_tweets(
                     self.__driver)
                 present_tweets = [
@@ -722,6 +892,8 @@ class Profile:
             self.__driver.get(self.URL) # type: ignore
             Utilities.wait_until_completion(self.__driver)
             Utilities.wait_until_tweets_appear(self.__driver)
+            if self.recorder is not None:
+                self.recorder.capture(self.__driver)
             self.__fetch_and_store_data()
             self.__close_driver()
             data = dict(list(self.posts_data.items())
@@ -733,12 +905,15 @@ class Profile:
                 "Error at method scrap : {} ".format(ex))
 
 
+# headers of the CSV file
+FIELDNAMES = ['tweet_id', 'username', 'name', 'profile_picture', 'replies',
+              'retweets', 'likes', 'is_retweet', 'retweet_link', 'posted_time', 'content', 'hashtags', 'mentions',
+              'images', 'videos', 'tweet_url', 'link']
+
+
 def json_to_csv(filename, json_data, directory):
     os.chdir(directory)  # change working directory to given directory
-    # headers of the CSV file
-    fieldnames = ['tweet_id', 'username', 'name', 'profile_picture', 'replies',
-                  'retweets', 'likes', 'is_retweet', 'retweet_link', 'posted_time', 'content', 'hashtags', 'mentions',
-                  'images', 'videos', 'tweet_url', 'link']
+    fieldnames = FIELDNAMES
     mode = 'w'
     if os.path.exists("{}.csv".format(filename)):
         mode = 'a'
@@ -776,9 +951,136 @@ def json_to_csv(filename, json_data, directory):
     logger.info('Data Successfully Saved to {}.csv'.format(filename))
 
 
+def open_output(location: str, mode: str = "w", compression_level: int = 3):
+    """Opens an output file for text reading or writing. Files ending in .zst
+    are compressed and decompressed as a stream while they are written or
+    read, appending adds another zstd frame to the file.
+
+    Args:
+        location (str): Path of the file.
+        mode (str, optional): "r", "w" or "a". Defaults to "w".
+        compression_level (int, optional): zstd compression level, from 1 (fastest) to 22 (smallest). Defaults to 3.
+
+    Returns:
+        text file object
+    """
+    if not location.endswith(".zst"):
+        return open(location, mode, newline='', encoding="utf-8")
+    if zstandard is None:
+        raise Exception("zstandard is not installed!")
+    if mode == "r":
+        reader = zstandard.ZstdDecompressor().stream_reader(
+            open(location, "rb"), read_across_frames=True, closefd=True)
+        return io.TextIOWrapper(reader, encoding="utf-8", newline='')  # type: ignore
+    writer = zstandard.ZstdCompressor(level=compression_level).stream_writer(
+        open(location, mode + "b"), closefd=True)
+    return io.TextIOWrapper(writer, encoding="utf-8", newline='')  # type: ignore
+
+
+def write_records(json_data, location: str, compression_level: int = 3):
+    """Appends tweets to a JSON lines (.jsonl) or CSV (.csv) file, optionally
+    compressed (.jsonl.zst, .csv.zst). Every tweet is encoded straight into the
+    file, the data is never turned into one big string.
+
+    Args:
+        json_data (dict): Tweets keyed by tweet id.
+        location (str): Path of the file, its extension selects the format.
+        compression_level (int, optional): zstd compression level for .zst files. Defaults to 3.
+    """
+    is_csv = location.endswith((".csv", ".csv.zst"))
+    write_header = not os.path.exists(location)
+    with open_output(location, "a", compression_level) as file:
+        if is_csv:
+            writer = csv.DictWriter(
+                file, fieldnames=FIELDNAMES, extrasaction='ignore')
+            if write_header:
+                writer.writeheader()
+        for key in json_data:
+            if is_csv:
+                writer.writerow(dict(json_data[key], tweet_id=key))
+            else:
+                json.dump(json_data[key], file, ensure_ascii=False)
+                file.write("\n")
+    logger.setLevel(logging.INFO)
+    logger.info('Data Successfully Saved to {}'.format(location))
+
+
+def read_records(location: str):
+    """Reads tweets back from a file written by write_records, one at a time
+
+    Args:
+        location (str): Path of a .jsonl, .csv, .jsonl.zst or .csv.zst file.
+
+    Yields:
+        dict: tweet record, CSV values are returned as strings
+    """
+    with open_output(location, "r") as file:
+        if location.endswith((".csv", ".csv.zst")):
+            for row in csv.DictReader(file):
+                yield row
+        else:
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def save_output(data, output_format: str = "json", filename: str = "", directory: str = os.getcwd(),
+                default_filename: str = "", compression: Union[str, None] = None,
+                compression_level: int = 3) -> Union[str, None]:
+    """Saves scraped tweets as JSON or CSV, shared by all scrape_* functions.
+
+    Args:
+        data (dict): Tweets keyed by tweet id.
+        output_format (str, optional): The output format, whether JSON, JSONL or CSV. Defaults to "json".
+        filename (str, optional): Name of the output file without extension. For JSON output the data is returned as a string if not passed, for the other formats default_filename is used. Defaults to "".
+        directory (str, optional): Directory the output file is saved in. Defaults to os.getcwd().
+        default_filename (str, optional): Filename used if filename is not passed. Defaults to "".
+        compression (Union[str, None], optional): "zstd" to write a compressed <filename>.jsonl.zst or <filename>.csv.zst, JSON output is written as JSONL then. Defaults to None.
+        compression_level (int, optional): zstd compression level, from 1 (fastest) to 22 (smallest). Defaults to 3.
+
+    Returns:
+        Union[str, None]: tweets data as JSON string if output_format is JSON and no filename was passed
+    """
+    if compression not in (None, "zstd"):
+        raise Exception("Compression not supported!")
+    if compression or output_format.lower() == "jsonl":
+        if filename == "":
+            filename = default_filename
+        extension = "csv" if output_format.lower() == "csv" else "jsonl"
+        location = os.path.join(directory, "{}.{}".format(filename, extension))
+        if compression:
+            location += ".zst"
+        write_records(data, location, compression_level)
+    elif output_format.lower() == "json":
+        if filename == '':
+          # if filename was not provided then print the JSON to console
+            return json.dumps(data)
+        # if filename was provided, save it to that file
+        json_file_location = os.path.join(directory, filename+".json")
+        if os.path.exists(json_file_location):
+            with open(json_file_location, 'r', encoding='utf-8') as file:
+                try:
+                    content = json.loads(file.read())
+                except json.decoder.JSONDecodeError:
+                    logger.warning('Invalid JSON Detected!')
+                    content = {}
+            data.update(content)
+        with open(json_file_location, 'w', encoding='utf-8') as file_in_write_mode:
+            json.dump(data, file_in_write_mode)
+        logger.setLevel(logging.INFO)
+        logger.info(
+            'Data Successfully Saved to {}'.format(json_file_location))
+    elif output_format.lower() == "csv":
+        if filename == "":
+            filename = default_filename
+        json_to_csv(filename=filename, json_data=data, directory=directory)
+
+
 def scrape_profile(twitter_username: str, browser: str = "firefox", proxy: Union[str, None] = None,
                   tweets_count: int = 30, output_format: str = "json", filename: str = "", directory: str = os.getcwd(),
-                  headless: bool = True, browser_profile: Union[str, None] = None):
+                  headless: bool = True, browser_profile: Union[str, None] = None, media_directory: Union[str, None] = None,
+                  media_workers: int = 8, compression: Union[str, None] = None, compression_level: int = 3,
+                  warm_cache: Union[str, None] = None, record: Union[str, None] = None):
     """Scrap tweets of twitter profile using twitter username.
 
     Args:
@@ -786,49 +1088,44 @@ def scrape_profile(twitter_username: str, browser: str = "firefox", proxy: Union
         browser (str, optional): Which browser to use for scraping?, Only 2 are supported Chrome and Firefox. Defaults to "firefox".
         proxy (Union[str, None], optional): Optional parameter, if user wants to use proxy for scraping. If the proxy is authenticated proxy then the proxy format is username:password@host:port. Defaults to None.
         tweets_count (int, optional): Number of posts to scrap. Defaults to 10.
-        output_format (str, optional): The output format, whether JSON or CSV. Defaults to "json".
+        output_format (str, optional): The output format, whether JSON, JSONL or CSV. Defaults to "json".
         filename (str, optional): If output_format parameter is set to CSV, then it is necessary for filename parameter to passed. If not passed then the filename will be same as keyword passed. Defaults to "".
         directory (str, optional): If output_format parameter is set to CSV, then it is valid for directory parameter to be passed. If not passed then CSV file will be saved in current working directory. Defaults to os.getcwd().
         headless (bool, optional): Whether to run browser in headless mode?. Defaults to True.
         browser_profile (Union[str, None], optional): Path of Browser Profile where cookies might be located to scrap data in authenticated way. Defaults to None.
+        media_directory (Union[str, None], optional): If passed, images, videos and profile pictures of the tweets are downloaded to this directory while scraping. Defaults to None.
+        media_workers (int, optional): Number of media downloads running at the same time. Defaults to 8.
+        compression (Union[str, None], optional): "zstd" to write a compressed <filename>.jsonl.zst or <filename>.csv.zst. Defaults to None.
+        compression_level (int, optional): zstd compression level, from 1 (fastest) to 22 (smallest). Defaults to 3.
+        warm_cache (Union[str, None], optional): Directory where browser profiles and disk caches are kept between runs, so Twitter's scripts and styles can be served from the disk cache (not yet checked with a real chrome behind the proxy). Ignored for the profile directory if browser_profile is passed. Defaults to None.
+        record (Union[str, None], optional): Path of an archive the timeline snapshots and API responses of the session are saved to, replay it with recording.replay_profile. Defaults to None.
 
     Returns:
         str: tweets data in CSV or JSON
     """
-    profile_bot = Profile(twitter_username, browser,
-                          proxy, tweets_count, headless, browser_profile)
-    data = profile_bot.scrap()
-    
-    json_object = json.dumps(data, ensure_ascii=False, indent=4)
-    with open("DATA.json", "w", encoding='utf-8') as outfile:
-        outfile.write(json_object)
-        # Writing to sample.json
-    if output_format.lower() == "json":
-        if filename == '':
-          # if filename was not provided then print the JSON to console
-            return json.dumps(data)
-        elif filename != '':
-          # if filename was provided, save it to that file
-            mode = 'w'
-            json_file_location = os.path.join(directory, filename+".json")
-            if os.path.exists(json_file_location):
-                mode = 'r'
-            with open(json_file_location, mode, encoding='utf-8') as file:
-                if mode == 'r':
-                    try:
-                        file_content = file.read()
-                        content = json.loads(file_content)
-                    except json.decoder.JSONDecodeError:
-                        logger.warning('Invalid JSON Detected!')
-                        content = {}
-                    file.close()
-                    data.update(content)  # type: ignore
-                    with open(json_file_location, 'w', encoding='utf-8') as file_in_write_mode:
-                        json.dump(data, file_in_write_mode)
-                logger.setLevel(logging.INFO)
-                logger.info(
-                    'Data Successfully Saved to {}'.format(json_file_location))     
-    elif output_format.lower() == "csv":
-        if filename == "":
-            filename = twitter_username
-        json_to_csv(filename=filename, json_data=data, directory=directory)
\ No newline at end of file
+    cache = None
+    if warm_cache:
+        from browser_cache import WarmCache
+        cache = WarmCache(warm_cache, browser)
+    recorder = None
+    if record:
+        from recording import ScrapeRecorder
+        recorder = ScrapeRecorder(record, twitter_username)
+    if media_directory:
+        from media_downloader import MediaDownloader
+        with MediaDownloader(media_directory, workers=media_workers, proxy=proxy) as downloader:
+            profile_bot = Profile(twitter_username, browser,
+                                  proxy, tweets_count, headless, browser_profile, on_tweet=downloader.submit_record,
+                                  warm_cache=cache, recorder=recorder)
+            data = profile_bot.scrap()
+    else:
+        profile_bot = Profile(twitter_username, browser,
+                              proxy, tweets_count, headless, browser_profile, warm_cache=cache, recorder=recorder)
+        data = profile_bot.scrap()
+    if recorder is not None:
+        recorder.save()
+    data = data or {}
+    # DATA.json is compressed like the output, as DATA.json.zst
+    with open_output("DATA.json.zst" if compression else "DATA.json", "w", compression_level) as outfile:
+        json.dump(data, outfile, ensure_ascii=False, indent=4)
+    return save_output(data, output_format, filename, directory, twitter_username, compression, compression_level)
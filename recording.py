@@ -0,0 +1,300 @@
+import re
+import json
+import zipfile
+from urllib.parse import urljoin
+from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
+from selenium.common.exceptions import NoSuchElementException
+from typing import Union
+from profile_info import Profile, logger
+
+try:
+    from bs4 import BeautifulSoup, NavigableString, Comment
+except ImportError:
+    BeautifulSoup = None
+
+
+ARCHIVE_VERSION = 1
+# only the timeline is kept, the rest of the page is scripts and styles
+SNAPSHOT_SCRIPT = """
+var main = document.querySelector('main');
+return '<html><body>' + (main ? main.outerHTML : document.body.innerHTML) + '</body></html>';
+"""
+# tags that start a new line in the text Selenium returns for an element
+BLOCK_TAGS = {"address", "article", "aside", "blockquote", "div", "dl", "dt", "dd", "fieldset", "figcaption",
+              "figure", "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6", "header", "hr", "li", "main",
+              "nav", "ol", "p", "pre", "section", "table", "tr", "ul"}
+# attributes Selenium returns as absolute URLs
+URL_ATTRIBUTES = {"href", "src"}
+
+
+class ScrapeRecorder:
+    """
+    Saves what a real scraping session saw, so it can be replayed with
+    ReplayDriver without a browser. Profile calls capture after the page
+    loaded and after every scroll step, save writes a zip archive with one
+    HTML snapshot of the timeline per step and the API responses captured by
+    selenium-wire.
+    """
+
+    def __init__(self, location: str, twitter_username: str = "", url_filter: str = "/i/api/"):
+        """Initialize ScrapeRecorder
+
+        Args:
+            location (str): Path of the archive to write.
+            twitter_username (str, optional): Username of the scraped profile, replay_profile scrapes it again. Defaults to "".
+            url_filter (str, optional): Only responses whose URL contains this are saved. Defaults to "/i/api/".
+        """
+        self.location = location
+        self.twitter_username = twitter_username
+        self.url_filter = url_filter
+        self.snapshots = []
+        self.responses = []
+
+    def capture(self, driver):
+        """saves a snapshot of the timeline and the API responses received
+        since the last capture. The requests selenium-wire captured are
+        cleared afterwards, so every capture only reads the requests of one
+        step, a response still pending at that moment is not saved."""
+        try:
+            self.snapshots.append({"url": driver.current_url,
+                                   "html": driver.execute_script(SNAPSHOT_SCRIPT)})
+        except Exception as ex:
+            logger.warning("Error at capture : {}".format(ex))
+        try:
+            requests = driver.requests
+        except AttributeError:
+            # not a selenium-wire driver
+            return
+        try:
+            del driver.requests
+        except Exception as ex:
+            logger.warning("Error at capture : {}".format(ex))
+        for request in requests:
+            if request.response is None or self.url_filter not in request.url:
+                continue
+            try:
+                from seleniumwire.utils import decode
+                body = decode(request.response.body, request.response.headers.get(
+                    "Content-Encoding", "identity"))
+                self.responses.append({"url": request.url, "method": request.method,
+                                       "status_code": request.response.status_code,
+                                       "headers": {"Content-Type": request.response.headers.get("Content-Type", "")},
+                                       "body": body})
+            except Exception as ex:
+                logger.warning("Error at capture : {}".format(ex))
+
+    def save(self) -> str:
+        """writes the archive and returns its location"""
+        manifest = {"version": ARCHIVE_VERSION, "twitter_username": self.twitter_username,
+                    "snapshots": [], "responses": []}
+        with zipfile.ZipFile(self.location, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            for number, snapshot in enumerate(self.snapshots):
+                name = "snapshots/{:04d}.html".format(number)
+                archive.writestr(name, snapshot["html"] or "")
+                manifest["snapshots"].append(
+                    {"url": snapshot["url"], "file": name})
+            for number, response in enumerate(self.responses):
+                name = "responses/{:04d}".format(number)
+                archive.writestr(name, response["body"])
+                entry = {key: value for key,
+                         value in response.items() if key != "body"}
+                entry["file"] = name
+                manifest["responses"].append(entry)
+            archive.writestr("manifest.json", json.dumps(manifest, indent=4))
+        logger.info("Recording saved to {}".format(self.location))
+        return self.location
+
+
+class ReplayResponse:
+    def __init__(self, status_code, headers, body):
+        self.status_code = status_code
+        self.headers = headers
+        self.body = body
+
+
+class ReplayRequest:
+    def __init__(self, url, method, response):
+        self.url = url
+        self.method = method
+        self.response = response
+
+
+class ReplayElement:
+    """the part of the WebElement interface used by Finder and Utilities, on
+    top of a BeautifulSoup tag"""
+
+    def __init__(self, driver, node, base_url):
+        self.driver = driver
+        self.node = node
+        self.base_url = base_url
+
+    def __eq__(self, other):
+        return isinstance(other, ReplayElement) and self.node is other.node
+
+    def __hash__(self):
+        return id(self.node)
+
+    def find_elements(self, by=By.ID, value=None) -> list:
+        if by == By.CSS_SELECTOR:
+            nodes = self.node.select(value)
+        elif by == By.TAG_NAME:
+            nodes = self.node.find_all(value)
+        elif by == By.ID:
+            nodes = self.node.find_all(id=value)
+        elif by == By.CLASS_NAME:
+            nodes = self.node.find_all(class_=value)
+        else:
+            raise NotImplementedError(
+                "ReplayDriver does not support {}".format(by))
+        return [ReplayElement(self.driver, node, self.base_url) for node in nodes]
+
+    def find_element(self, by=By.ID, value=None):
+        elements = self.find_elements(by, value)
+        if not elements:
+            raise NoSuchElementException(
+                "Unable to locate element: {}".format(value))
+        return elements[0]
+
+    def get_attribute(self, name) -> Union[str, None]:
+        value = self.node.get(name)
+        if value is None:
+            return None
+        if isinstance(value, list):
+            return " ".join(value)
+        if name in URL_ATTRIBUTES:
+            return urljoin(self.base_url, value)
+        return value
+
+    @property
+    def tag_name(self) -> str:
+        return self.node.name
+
+    @property
+    def text(self) -> str:
+        """the rendered text of the element, block elements on their own lines"""
+        parts = []
+
+        def walk(node):
+            for child in node.children:
+                if isinstance(child, Comment):
+                    continue
+                if isinstance(child, NavigableString):
+                    parts.append(str(child))
+                elif child.name == "br":
+                    parts.append("\n")
+                elif child.name not in ("script", "style"):
+                    block = child.name in BLOCK_TAGS
+                    if block:
+                        parts.append("\n")
+                    walk(child)
+                    if block:
+                        parts.append("\n")
+        walk(self.node)
+        lines = [re.sub(r"[ \t]+", " ", line).strip()
+                 for line in "".join(parts).split("\n")]
+        return "\n".join(line for line in lines if line)
+
+    def send_keys(self, *keys):
+        if Keys.PAGE_DOWN in keys:
+            self.driver.scroll()
+
+
+class ReplayDriver:
+    """
+    Serves a recording of ScrapeRecorder through the part of the WebDriver
+    interface used by Profile, Finder and Utilities. The first snapshot is
+    shown after get, and every scroll moves to the next one once the page is
+    looked at again, however many keys were sent. The last snapshot is kept
+    when the recording ends, which lets Profile run out of retries as on a
+    timeline without more tweets.
+    """
+
+    # Utilities.wait_until_completion and wait_until_tweets_appear have
+    # nothing to wait for
+    page_load_delay = (0, 0)
+    wait_timeout = 0
+
+    def __init__(self, location: str):
+        if BeautifulSoup is None:
+            raise Exception("beautifulsoup4 is not installed!")
+        with zipfile.ZipFile(location) as archive:
+            self.manifest = json.loads(archive.read("manifest.json"))
+            if self.manifest.get("version") != ARCHIVE_VERSION:
+                raise Exception("Unsupported recording version {}!".format(
+                    self.manifest.get("version")))
+            self.snapshots = [{"url": snapshot["url"], "html": archive.read(snapshot["file"]).decode("utf-8")}
+                              for snapshot in self.manifest["snapshots"]]
+            self.requests = [ReplayRequest(response["url"], response.get("method", "GET"),
+                                           ReplayResponse(response["status_code"], response["headers"], archive.read(response["file"])))
+                             for response in self.manifest["responses"]]
+        if not self.snapshots:
+            raise Exception("Recording {} has no snapshots!".format(location))
+        self.twitter_username = self.manifest.get("twitter_username", "")
+        self.index = 0
+        self.current_url = self.snapshots[0]["url"]
+        self.__scroll_pending = False
+        self.__documents = {}
+
+    def get(self, url):
+        if url.rstrip("/").lower() != self.snapshots[0]["url"].rstrip("/").lower():
+            logger.warning("Replaying {} for {}".format(
+                self.snapshots[0]["url"], url))
+        self.current_url = url
+        self.index = 0
+        self.__scroll_pending = False
+
+    def scroll(self):
+        self.__scroll_pending = True
+
+    def __document(self):
+        if self.__scroll_pending:
+            self.index = min(self.index + 1, len(self.snapshots) - 1)
+            self.__scroll_pending = False
+        if self.index not in self.__documents:
+            # parsed once, so the same tweet of the same step is the same element
+            self.__documents[self.index] = BeautifulSoup(
+                self.snapshots[self.index]["html"], "html.parser")
+        return ReplayElement(self, self.__documents[self.index], self.snapshots[self.index]["url"])
+
+    def find_elements(self, by=By.ID, value=None) -> list:
+        return self.__document().find_elements(by, value)
+
+    def find_element(self, by=By.ID, value=None):
+        return self.__document().find_element(by, value)
+
+    @property
+    def page_source(self) -> str:
+        return str(self.__document().node)
+
+    def execute_script(self, script, *args):
+        self.__document()
+        if "readyState" in script:
+            return "complete"
+        if script == SNAPSHOT_SCRIPT:
+            return self.snapshots[self.index]["html"]
+        logger.warning("ReplayDriver does not run scripts")
+        return None
+
+    def close(self):
+        pass
+
+    def quit(self):
+        pass
+
+
+def replay_profile(location: str, tweets_count: int = 30) -> Union[dict, None]:
+    """Runs Profile.scrap on a recording made with scrape_profile(record=...),
+    without a browser or network.
+
+    Args:
+        location (str): Path of the recording.
+        tweets_count (int, optional): Number of posts to scrap. Defaults to 30.
+
+    Returns:
+        Union[dict, None]: tweets keyed by tweet id, as returned by Profile.scrap
+    """
+    driver = ReplayDriver(location)
+    profile_bot = Profile(driver.twitter_username, None, None,
+                          tweets_count, True, None, driver=driver)
+    return profile_bot.scrap()
@@ -0,0 +1,232 @@
+import os
+import re
+import threading
+from datetime import date, timedelta
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from dateutil.parser import parse
+from typing import Union
+from profile_info import Scraping_utilities, save_output, logger, AUTHORIZATION_KEY
+
+
+SEARCH_URL = "https://twitter.com/i/api/2/search/adaptive.json"
+
+
+class Search:
+    """this class needs to be instantiated in order to scrape the search
+    results of a keyword, for example "from:jack", over a range of dates. The
+    range is split into windows that are paged over HTTP concurrently, windows
+    with more tweets than one worker should page alone are split further."""
+
+    def __init__(self, keyword, since, until=None, proxy=None, tweets_count=None, shards=8, workers=4,
+                 max_pages_per_window=20, api_url=SEARCH_URL, x_guest_token=None):
+        self.keyword = keyword
+        self.since = parse(str(since)).date()
+        self.until = parse(str(until)).date() if until else date.today() + timedelta(days=1)
+        self.proxy = proxy
+        self.tweets_count = tweets_count
+        self.shards = shards
+        self.workers = workers
+        self.max_pages_per_window = max(1, max_pages_per_window)
+        self.api_url = api_url
+        self.x_guest_token = x_guest_token
+        self.posts_data = {}
+        # set once scrap has what it needs, windows still running stop paging
+        self.stopped = threading.Event()
+
+    @staticmethod
+    def split_date_range(since: date, until: date, shards: int) -> list:
+        """Splits [since, until) into at most shards windows of whole days
+
+        Args:
+            since (date): First day of the range.
+            until (date): Day after the last day of the range, like the until: search operator.
+            shards (int): Number of windows.
+
+        Returns:
+            list: (since, until) tuples, newest window first
+        """
+        days = (until - since).days
+        if days <= 0:
+            return []
+        shards = max(1, min(shards, days))
+        windows = []
+        for shard in range(shards):
+            start = since + timedelta(days=days * shard // shards)
+            end = since + timedelta(days=days * (shard + 1) // shards)
+            windows.append((start, end))
+        return windows[::-1]
+
+    @staticmethod
+    def find_entries(response) -> list:
+        """finds all timeline entries of the search page"""
+        entries = []
+        for instruction in response.get("timeline", {}).get("instructions", []):
+            if "addEntries" in instruction:
+                entries.extend(instruction["addEntries"].get("entries", []))
+            elif "replaceEntry" in instruction:
+                entries.append(instruction["replaceEntry"].get("entry", {}))
+        return entries
+
+    @staticmethod
+    def find_cursor(response) -> Union[str, None]:
+        """finds the cursor pointing to the next page"""
+        for entry in Search.find_entries(response):
+            cursor = entry.get("content", {}).get(
+                "operation", {}).get("cursor", {})
+            if cursor.get("cursorType") == "Bottom" or entry.get("entryId", "").startswith("sq-cursor-bottom"):
+                return cursor.get("value")
+        return None
+
+    @staticmethod
+    def parse_tweets(response) -> list:
+        """converts the search results of the page to tweet records"""
+        tweets = response.get("globalObjects", {}).get("tweets", {})
+        users = response.get("globalObjects", {}).get("users", {})
+        # globalObjects also holds quoted and retweeted tweets, the entries
+        # tell which of them are actual results
+        tweet_ids = [entry["content"]["item"]["content"]["tweet"]["id"] for entry in Search.find_entries(response)
+                     if "tweet" in entry.get("content", {}).get("item", {}).get("content", {})]
+        records = []
+        for tweet_id in tweet_ids:
+            try:
+                tweet = tweets[tweet_id]
+                retweet_link = ""
+                retweeted_id = tweet.get("retweeted_status_id_str")
+                if retweeted_id in tweets:
+                    retweet_link = "https://twitter.com/{}/status/{}".format(
+                        users[tweets[retweeted_id]["user_id_str"]]["screen_name"], retweeted_id)
+                records.append(Scraping_utilities.build_tweet_record(
+                    tweet_id, tweet, users[tweet["user_id_str"]], retweet_link))
+            except Exception as ex:
+                logger.warning("Error at parse_tweets : {}".format(ex))
+        return records
+
+    def scrape_window(self, since: date, until: date, headers: dict) -> tuple:
+        """Pages the search results of one window.
+
+        Returns:
+            tuple: tweets of the window keyed by tweet id, and the windows still
+            to be scraped if the window was too dense to page to the end
+        """
+        query = Scraping_utilities.build_search_query(
+            self.keyword, since=since.isoformat(), until=until.isoformat())
+        records = {}
+        cursor = None
+        pages = 0
+        while True:
+            if self.stopped.is_set():
+                return records, []
+            if pages >= self.max_pages_per_window and (until - since).days > 1:
+                break
+            response = Scraping_utilities.make_http_request_with_params(
+                self.api_url, Scraping_utilities.build_search_params(query, cursor), headers, self.proxy)
+            pages += 1
+            if response is None:
+                logger.warning(
+                    "Failed to fetch {} - {}".format(since, until))
+                return records, []
+            new_tweets = [tweet for tweet in Search.parse_tweets(
+                response) if tweet["tweet_id"] not in records]
+            for tweet in new_tweets:
+                records[tweet["tweet_id"]] = tweet
+            cursor = Search.find_cursor(response)
+            if not new_tweets or not cursor:
+                return records, []
+        # results come newest first, so everything after the oldest tweet
+        # found so far is already covered
+        oldest = min(parse(tweet["posted_time"]).date()
+                     for tweet in records.values())
+        remaining_until = min(until, oldest + timedelta(days=1))
+        logger.info("{} - {} is dense, splitting {} - {}".format(since,
+                    until, since, remaining_until))
+        return records, Search.split_date_range(since, remaining_until, 2)
+
+    def __has_enough(self, windows) -> bool:
+        """tells if the newest tweets_count tweets are found, which is once
+        every window that can still hold a newer tweet is done"""
+        if self.tweets_count is None or len(self.posts_data) < self.tweets_count:
+            return False
+        newest = sorted(self.posts_data, key=int, reverse=True)
+        last_day = parse(
+            self.posts_data[newest[int(self.tweets_count) - 1]]["posted_time"]).date()
+        # a window ends the day before until, so only the older ones are left
+        return all(until <= last_day for since, until in windows)
+
+    def scrap(self):
+        try:
+            x_guest_token = self.x_guest_token or Scraping_utilities.find_x_guest_token(
+                AUTHORIZATION_KEY, self.proxy)
+            headers = Scraping_utilities.build_keyword_headers(
+                x_guest_token, AUTHORIZATION_KEY, self.keyword)
+            self.stopped.clear()
+            executor = ThreadPoolExecutor(max_workers=self.workers)
+            pending = {}
+            try:
+                pending = {executor.submit(self.scrape_window, since, until, headers): (since, until)
+                           for since, until in Search.split_date_range(self.since, self.until, self.shards)}
+                while pending and not self.__has_enough(pending.values()):
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        del pending[future]
+                        records, remaining = future.result()
+                        self.posts_data.update(records)
+                        for since, until in remaining:
+                            pending[executor.submit(
+                                self.scrape_window, since, until, headers)] = (since, until)
+            finally:
+                # the windows left only hold older tweets, running ones
+                # stop at their next page instead of being waited for
+                self.stopped.set()
+                for future in pending:
+                    future.cancel()
+                executor.shutdown(wait=False)
+            data = dict(sorted(self.posts_data.items(),
+                               key=lambda item: int(item[0]), reverse=True))
+            if self.tweets_count is not None:
+                data = dict(list(data.items())[0:int(self.tweets_count)])
+            return data
+        except Exception as ex:
+            logger.exception("Error at method scrap : {} ".format(ex))
+
+
+def run_search_job(payload: dict) -> dict:
+    """Scrapes the window described by a "search" job payload"""
+    search_bot = Search(payload["keyword"], payload["since"], payload["until"], payload.get("proxy"),
+                        payload.get("tweets_count"), shards=1, workers=payload.get("workers", 1),
+                        max_pages_per_window=payload.get("max_pages_per_window", 20))
+    data = search_bot.scrap()
+    if data is None:
+        raise RuntimeError("Failed to search {} from {} to {}".format(
+            payload["keyword"], payload["since"], payload["until"]))
+    return data
+
+
+def scrape_search(keyword: str, since: str, until: Union[str, None] = None, proxy: Union[str, None] = None,
+                  tweets_count: Union[int, None] = None, shards: int = 8, workers: int = 4,
+                  output_format: str = "json", filename: str = "", directory: str = os.getcwd(),
+                  compression: Union[str, None] = None, compression_level: int = 3):
+    """Scrap search results of a keyword between two dates, with the date range
+    split into windows that are scraped in parallel.
+
+    Args:
+        keyword (str): Keyword to search on twitter, use from:username for the tweets of an account.
+        since (str): First day to search, format is YYYY-MM-DD.
+        until (Union[str, None], optional): Day after the last day to search, format is YYYY-MM-DD. Defaults to tomorrow.
+        proxy (Union[str, None], optional): Optional parameter, if user wants to use proxy for scraping. If the proxy is authenticated proxy then the proxy format is username:password@host:port. Defaults to None.
+        tweets_count (Union[int, None], optional): Number of posts to scrap, all posts of the range if not passed. Defaults to None.
+        shards (int, optional): Number of windows the date range is split into. Defaults to 8.
+        workers (int, optional): Number of windows scraped at the same time. Defaults to 4.
+        output_format (str, optional): The output format, whether JSON, JSONL or CSV. Defaults to "json".
+        filename (str, optional): Name of the output file without extension. If output_format is CSV and it is not passed then the keyword is used. Defaults to "".
+        directory (str, optional): Directory where the output file is saved. Defaults to os.getcwd().
+        compression (Union[str, None], optional): "zstd" to write a compressed <filename>.jsonl.zst or <filename>.csv.zst. Defaults to None.
+        compression_level (int, optional): zstd compression level, from 1 (fastest) to 22 (smallest). Defaults to 3.
+
+    Returns:
+        str: tweets data in CSV or JSON
+    """
+    search_bot = Search(keyword, since, until, proxy,
+                        tweets_count, shards, workers)
+    data = search_bot.scrap()
+    return save_output(data or {}, output_format, filename, directory, re.sub(r"\W+", "_", keyword).strip("_"),
+                       compression, compression_level)
@@ -0,0 +1,70 @@
+import os
+import sys
+import threading
+from http.server import ThreadingHTTPServer
+import pytest
+
+# the modules live in the repository root, not in a package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def local_server():
+    """starts a local HTTP server for the handler class passed. The handler
+    can record what it is asked in server.requests, server.url is the
+    address to send requests to. Servers are stopped after the test."""
+    servers = []
+
+    def start(handler, **attributes):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        server.requests = []
+        server.url = "http://127.0.0.1:{}".format(server.server_address[1])
+        for name, value in attributes.items():
+            setattr(server, name, value)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+class FakeDriver:
+    def close(self):
+        pass
+
+    def quit(self):
+        pass
+
+
+class FakeInitializer:
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def init(self):
+        return FakeDriver()
+
+
+@pytest.fixture
+def fake_browser(monkeypatch):
+    """replaces Initializer and Profile of the modules passed, so nothing
+    starts a browser. Every Profile.scrap returns the next item of the list
+    that is returned."""
+    results = []
+
+    class FakeProfile:
+        def __init__(self, *args, **kwargs):
+            pass
+
+        def scrap(self):
+            return results.pop(0)
+
+    def install(*modules):
+        for module in modules:
+            if hasattr(module, "Initializer"):
+                monkeypatch.setattr(module, "Initializer", FakeInitializer)
+            if hasattr(module, "Profile"):
+                monkeypatch.setattr(module, "Profile", FakeProfile)
+        return results
+    return install
@@ -0,0 +1,163 @@
+import os
+import ssl
+import sys
+import shutil
+import signal
+import datetime
+import threading
+import subprocess
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import pytest
+from browser_cache import WarmCache
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_slots_are_not_shared(tmp_path):
+    first, second = WarmCache(str(tmp_path), "chrome"), WarmCache(str(tmp_path), "chrome")
+    slot = first.acquire()
+    assert second.acquire() != slot
+    first.release(slot)
+    assert second.acquire() == slot
+    assert os.path.isdir(os.path.join(slot, "profile")) and os.path.isdir(os.path.join(slot, "cache"))
+
+
+def test_all_slots_in_use(tmp_path):
+    cache = WarmCache(str(tmp_path), "chrome", max_slots=1)
+    cache.acquire()
+    with pytest.raises(Exception):
+        WarmCache(str(tmp_path), "chrome", max_slots=1).acquire()
+
+
+def test_lock_of_a_killed_process_is_released(tmp_path):
+    holder = subprocess.Popen([sys.executable, "-c", "import sys; sys.path.insert(0, {!r}); from browser_cache import WarmCache; "
+                               "print(WarmCache({!r}, 'chrome').acquire(), flush=True); sys.stdin.read()".format(ROOT, str(tmp_path))],
+                              stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+    try:
+        slot = holder.stdout.readline().strip()
+        cache = WarmCache(str(tmp_path), "chrome")
+        assert cache.acquire() != slot
+        os.kill(holder.pid, signal.SIGKILL)
+        holder.wait()
+        assert WarmCache(str(tmp_path), "chrome").acquire() == slot
+    finally:
+        if holder.poll() is None:
+            holder.kill()
+
+
+def test_oversized_and_unused_slots_are_cleaned_up(tmp_path):
+    cache = WarmCache(str(tmp_path), "chrome", max_bytes=1000, max_age=60)
+    big, old = cache.acquire(), cache.acquire()
+    with open(os.path.join(big, "cache", "data"), "wb") as file:
+        file.write(b"0" * 5000)
+    cache.release(big)
+    assert os.listdir(os.path.join(big, "cache")) == []
+    cache.release(old)
+    os.utime(old, (0, 0))
+    cache.cleanup(force=True)
+    assert os.path.isdir(big) and not os.path.exists(old)
+
+
+def test_large_profile_does_not_empty_a_small_cache(tmp_path):
+    cache = WarmCache(str(tmp_path), "chrome", max_bytes=1000)
+    slot = cache.acquire()
+    with open(os.path.join(slot, "profile", "History"), "wb") as file:
+        file.write(b"0" * 5000)
+    with open(os.path.join(slot, "cache", "data"), "wb") as file:
+        file.write(b"0" * 300)
+    cache.release(slot)
+    assert os.listdir(os.path.join(slot, "cache")) == ["data"]
+
+
+def test_chrome_trusts_the_proxy_certificates_of_a_cache_slot(tmp_path):
+    from selenium.webdriver.chrome.options import Options
+    from profile_info import Initializer
+    slot = WarmCache(str(tmp_path), "chrome").acquire()
+    arguments = Initializer("chrome", True, cache_dir=slot, cache_size=1000).set_properties(Options()).arguments
+    assert "--user-data-dir={}".format(os.path.join(slot, "profile")) in arguments
+    assert "--disk-cache-dir={}".format(os.path.join(slot, "cache")) in arguments
+    assert "--ignore-certificate-errors-spki-list={}".format(Initializer.find_proxy_spki()) in arguments
+
+
+def find_chrome():
+    for name in ("chromium", "chromium-browser", "google-chrome", "chrome"):
+        if shutil.which(name):
+            return shutil.which(name)
+    return None
+
+
+class AssetHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self.server.requests.append(self.path)
+        if self.path == "/app.js":
+            body, content_type = b"document.title = 'loaded';", "application/javascript"
+        else:
+            body, content_type = b"<html><head><script src='/app.js'></script></head><body>page</body></html>", "text/html"
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        if self.path == "/app.js":
+            self.send_header("Cache-Control", "public, max-age=86400")
+        else:
+            self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def make_certificate(directory):
+    from cryptography import x509
+    from cryptography.x509.oid import NameOID
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import rsa
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "127.0.0.1")])
+    now = datetime.datetime.utcnow()
+    certificate = x509.CertificateBuilder().subject_name(name).issuer_name(name).public_key(key.public_key()).serial_number(
+        x509.random_serial_number()).not_valid_before(now - datetime.timedelta(days=1)).not_valid_after(
+        now + datetime.timedelta(days=1)).sign(key, hashes.SHA256())
+    location = os.path.join(directory, "server.pem")
+    with open(location, "wb") as file:
+        file.write(key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.TraditionalOpenSSL,
+                                     serialization.NoEncryption()))
+        file.write(certificate.public_bytes(serialization.Encoding.PEM))
+    return location
+
+
+# not run yet, no chrome was available where the warm cache was written
+@pytest.mark.skipif(find_chrome() is None or shutil.which("chromedriver") is None,
+                    reason="needs chrome and chromedriver on PATH")
+def test_cached_assets_are_not_fetched_again(tmp_path):
+    from seleniumwire import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.chrome.service import Service
+    from profile_info import Initializer
+    server = ThreadingHTTPServer(("127.0.0.1", 0), AssetHandler)
+    server.requests = []
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(make_certificate(str(tmp_path)))
+    server.socket = context.wrap_socket(server.socket, server_side=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    cache = WarmCache(str(tmp_path / "cache"), "chrome")
+    try:
+        for _ in range(2):
+            slot = cache.acquire()
+            options = Initializer("chrome", True, cache_dir=slot).set_properties(Options())
+            options.binary_location = find_chrome()
+            # chromium sends loopback requests past the proxy unless told otherwise
+            options.add_argument("--proxy-bypass-list=<-loopback>")
+            driver = webdriver.Chrome(service=Service(shutil.which("chromedriver")), options=options)
+            try:
+                driver.get("https://127.0.0.1:{}/".format(server.server_address[1]))
+                assert driver.title == "loaded"
+                assert any(request.url.endswith("/") for request in driver.requests)
+            finally:
+                driver.quit()
+                cache.release(slot)
+        assert server.requests.count("/") == 2
+        assert server.requests.count("/app.js") == 1
+    finally:
+        server.shutdown()
+        server.server_close()
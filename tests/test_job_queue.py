@@ -0,0 +1,105 @@
+import os
+import time
+import json
+import threading
+import pytest
+from job_queue import (QueueBackend, SQLiteQueue, QueueServer, HTTPQueue, DirectorySink, Coordinator,
+                       Worker, run_workers)
+
+
+def echo_job(payload):
+    time.sleep(0.01)
+    return {payload["twitter_username"]: {"pid": os.getpid()}}
+
+
+def test_queue_backend_is_abstract():
+    with pytest.raises(TypeError):
+        QueueBackend()  # type: ignore
+
+
+def test_expired_lease_is_handed_to_another_worker(tmp_path):
+    queue = SQLiteQueue(str(tmp_path / "jobs.db"))
+    job_id = queue.put("profile", {"twitter_username": "a"})
+    assert queue.claim("dead", 0.05)["id"] == job_id
+    assert queue.claim("alive", 60) is None
+    time.sleep(0.1)
+    job = queue.claim("alive", 60)
+    assert job["id"] == job_id and job["attempts"] == 2
+    assert not queue.heartbeat(job_id, "dead", 60)
+    assert queue.complete(job_id, "alive", "done.json")
+    assert queue.counts()["done"] == 1
+
+
+def test_local_worker_processes_drain_the_queue(tmp_path):
+    location = str(tmp_path / "jobs.db")
+    usernames = ["user{}".format(number) for number in range(12)]
+    Coordinator(SQLiteQueue(location)).submit_profiles(usernames)
+    counts = run_workers(location, str(tmp_path / "out"), processes=3,
+                         handlers={"profile": echo_job}, poll_interval=0.05)
+    assert counts == {"queued": 0, "leased": 0, "done": 12, "failed": 0}
+    assert set(DirectorySink(str(tmp_path / "out")).merge()) == set(usernames)
+
+
+def test_workers_reach_the_queue_over_http(tmp_path):
+    server = QueueServer(("127.0.0.1", 0), SQLiteQueue(str(tmp_path / "jobs.db")), "secret")
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        url = "http://127.0.0.1:{}".format(server.server_address[1])
+        Coordinator(HTTPQueue(url, "secret")).submit_profiles(["a", "b", "c"])
+        counts = run_workers(url, str(tmp_path / "out"), processes=2, token="secret",
+                             handlers={"profile": echo_job}, poll_interval=0.05)
+        assert counts["done"] == 3
+        with open(os.path.join(str(tmp_path / "out"), os.listdir(str(tmp_path / "out"))[0]), encoding="utf-8") as file:
+            assert len(json.load(file)) == 1
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_failed_job_is_retried_then_marked_failed(tmp_path):
+    queue = SQLiteQueue(str(tmp_path / "jobs.db"))
+    queue.put("profile", {"twitter_username": "a"}, max_attempts=2)
+
+    def broken_job(payload):
+        raise RuntimeError("no tweets")
+    worker = Worker(queue, DirectorySink(str(tmp_path / "out")),
+                    handlers={"profile": broken_job}, poll_interval=0.01)
+    assert worker.run(exit_when_empty=True) == 2
+    assert queue.counts()["failed"] == 1
+
+
+def test_queue_server_rejects_requests_without_the_token(tmp_path):
+    with pytest.raises(Exception):
+        QueueServer(("127.0.0.1", 0), SQLiteQueue(str(tmp_path / "jobs.db")), "")
+    queue = SQLiteQueue(str(tmp_path / "jobs.db"))
+    queue.put("profile", {"twitter_username": "a", "proxy": "user:password@host:8080"})
+    server = QueueServer(("127.0.0.1", 0), queue, "secret")
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        url = "http://127.0.0.1:{}".format(server.server_address[1])
+        for token in (None, "guess"):
+            with pytest.raises(RuntimeError):
+                HTTPQueue(url, token).claim("intruder", 60)
+        assert queue.counts()["queued"] == 1
+        assert HTTPQueue(url, "secret").claim("worker", 60)["payload"]["twitter_username"] == "a"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_serve_listens_on_localhost_by_default(monkeypatch, tmp_path):
+    import job_queue
+    started = {}
+
+    class FakeServer:
+        def __init__(self, address, queue, token):
+            started.update(address=address, token=token)
+
+        def serve_forever(self):
+            pass
+    monkeypatch.setattr(job_queue, "QueueServer", FakeServer)
+    monkeypatch.delenv(job_queue.TOKEN_VARIABLE, raising=False)
+    with pytest.raises(SystemExit):
+        job_queue.main(["--queue", str(tmp_path / "jobs.db"), "serve"])
+    job_queue.main(["--queue", str(tmp_path / "jobs.db"), "--token", "secret", "serve"])
+    assert started == {"address": ("127.0.0.1", 8700), "token": "secret"}
@@ -0,0 +1,98 @@
+import os
+import json
+import threading
+from http.server import BaseHTTPRequestHandler
+import pytest
+from media_downloader import MediaDownloader
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 200000
+JPEG = b"\xff\xd8\xff\xe0" + os.urandom(1000)
+MP4 = b"\x00\x00\x00\x18ftypmp42" + os.urandom(5000)
+
+
+class MediaHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self.server.requests.append(self.path)
+        body = {"/media/a.jpg": PNG, "/media/a?format=png&name=small": PNG, "/media/b.jpg": JPEG,
+                "/video/c.mp4": MP4}.get(self.path)
+        if self.path.startswith("/many/"):
+            body = self.path.encode() * 100
+        if body is None:
+            self.send_response(404)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def base_url(local_server):
+    return local_server(MediaHandler).url
+
+
+def stored_files(directory):
+    return sorted(os.path.relpath(os.path.join(path, name), directory)
+                  for path, _, files in os.walk(os.path.join(directory, "objects")) for name in files)
+
+
+def test_same_bytes_under_different_urls_are_stored_once(base_url, tmp_path):
+    directory = str(tmp_path)
+    with MediaDownloader(directory, workers=4, chunk_size=1024) as downloader:
+        downloader.submit_record({"profile_picture": base_url + "/media/b.jpg",
+                                  "images": [base_url + "/media/a.jpg", base_url + "/media/a?format=png&name=small"],
+                                  "videos": [base_url + "/video/c.mp4", base_url + "/missing.mp4"]})
+    files = stored_files(directory)
+    assert len(files) == 3
+    assert sorted(os.path.splitext(name)[1] for name in files) == [".jpg", ".mp4", ".png"]
+    with open(os.path.join(directory, "index.json"), encoding="utf-8") as file:
+        index = json.load(file)
+    assert index[base_url + "/media/a.jpg"] == index[base_url + "/media/a?format=png&name=small"]
+    assert index[base_url + "/media/a.jpg"].endswith(".png")
+    assert base_url + "/missing.mp4" not in index
+    with open(os.path.join(directory, index[base_url + "/video/c.mp4"]), "rb") as file:
+        assert file.read() == MP4
+
+
+def test_known_urls_are_not_downloaded_again(base_url, tmp_path):
+    directory = str(tmp_path)
+    with MediaDownloader(directory) as downloader:
+        downloader.submit(base_url + "/media/b.jpg")
+    with MediaDownloader(directory) as downloader:
+        assert downloader.submit(base_url + "/media/b.jpg") is None
+        assert downloader.location_of(base_url + "/media/b.jpg").endswith(".jpg")
+
+
+def test_index_is_saved_while_downloading(base_url, tmp_path):
+    directory = str(tmp_path)
+    downloader = MediaDownloader(directory, save_interval=0)
+    try:
+        downloader.submit(base_url + "/media/b.jpg").result()
+        with open(os.path.join(directory, "index.json"), encoding="utf-8") as file:
+            assert list(json.load(file)) == [base_url + "/media/b.jpg"]
+    finally:
+        downloader.close()
+
+
+def test_downloaders_sharing_a_directory_keep_each_others_entries(base_url, tmp_path):
+    directory = str(tmp_path)
+    results = {}
+
+    def run(name):
+        with MediaDownloader(directory, workers=4, save_interval=0) as downloader:
+            futures = [downloader.submit("{}/many/{}/{}".format(base_url, name, number)) for number in range(40)]
+            results[name] = [future.result() for future in futures]
+    threads = [threading.Thread(target=run, args=(name,)) for name in ("first", "second", "third")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert all(location is not None for locations in results.values() for location in locations)
+    with open(os.path.join(directory, "index.json"), encoding="utf-8") as file:
+        assert len(json.load(file)) == 120
+    assert [name for name in os.listdir(directory) if name.endswith(".tmp")] == []
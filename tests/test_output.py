@@ -0,0 +1,52 @@
+import os
+import json
+import pytest
+import profile_info
+from profile_info import save_output, read_records, open_output, scrape_profile
+
+pytest.importorskip("zstandard")
+
+DATA = {str(tweet_id): {"tweet_id": str(tweet_id), "username": "bbcbangla", "content": "সংবাদ {}".format(tweet_id),
+                        "hashtags": ["news"], "likes": tweet_id % 10} for tweet_id in range(1000, 1100)}
+
+
+@pytest.fixture
+def scraped(fake_browser, monkeypatch, tmp_path):
+    """scrape_profile without a browser, every scrape returns the next result
+    appended by the test"""
+    monkeypatch.chdir(tmp_path)
+    return fake_browser(profile_info)
+
+
+@pytest.mark.parametrize("output_format", ["json", "csv"])
+def test_compressed_output_round_trips(tmp_path, output_format):
+    save_output(dict(DATA), output_format, "tweets", str(tmp_path), compression="zstd")
+    extension = "csv" if output_format == "csv" else "jsonl"
+    records = list(read_records(str(tmp_path / "tweets.{}.zst".format(extension))))
+    assert [record["tweet_id"] for record in records] == list(DATA)
+    assert records[5]["content"] == DATA["1005"]["content"]
+
+
+def test_appending_adds_a_frame_that_is_read_back(tmp_path):
+    first, second = dict(list(DATA.items())[:50]), dict(list(DATA.items())[50:])
+    save_output(first, "jsonl", "tweets", str(tmp_path), compression="zstd")
+    save_output(second, "jsonl", "tweets", str(tmp_path), compression="zstd")
+    assert [record["tweet_id"] for record in read_records(str(tmp_path / "tweets.jsonl.zst"))] == list(DATA)
+
+
+def test_scrape_profile_compresses_data_json(scraped, tmp_path):
+    scraped.append(DATA)
+    scrape_profile("bbcbangla", output_format="csv", directory=str(tmp_path), compression="zstd")
+    assert not os.path.exists("DATA.json")
+    with open_output("DATA.json.zst", "r") as file:
+        assert json.load(file) == DATA
+    assert len(list(read_records(str(tmp_path / "bbcbangla.csv.zst")))) == len(DATA)
+
+
+def test_scrape_profile_saves_nothing_found_as_empty(scraped, tmp_path):
+    scraped.extend([None, None])
+    assert scrape_profile("bbcbangla") == "{}"
+    with open("DATA.json", encoding="utf-8") as file:
+        assert json.load(file) == {}
+    scrape_profile("bbcbangla", filename="tweets", directory=str(tmp_path), compression="zstd")
+    assert list(read_records(str(tmp_path / "tweets.jsonl.zst"))) == []
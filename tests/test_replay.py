@@ -0,0 +1,146 @@
+import os
+import json
+import time
+from selenium.webdriver.common.by import By
+from profile_info import Utilities, Finder
+from recording import ScrapeRecorder, ReplayDriver, SNAPSHOT_SCRIPT, replay_profile
+
+# not a live recording: written by ScrapeRecorder.capture from a WireDriver
+# showing timeline() of the steps [0-4], [3-8], [7-11], [11-13], with a
+# retweet of BBCWorld as tweet 5. The markup is written by hand after
+# Twitter's, only the retweet banner has Twitter's hashed classes, so
+# selectors relying on other hashed classes are not covered by it.
+ARCHIVE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "recording", "bbcbangla.zip")
+FIRST = 1594000000000000000
+
+
+def article(number, user="bbcbangla", retweet=False):
+    """a tweet as the timeline shows it, with the test ids Profile looks for"""
+    status = FIRST + number
+    social = ('<div class="css-1dbjc4n r-92ng3h r-qvutc0" data-testid="socialContext"><span>BBC News বাংলা Retweeted</span></div>'
+              if retweet else "")
+    return ('<article data-testid="tweet" tabindex="0"><div class="css-1dbjc4n">{social}'
+            '<div class="css-1dbjc4n"><a href="/{user}" role="link"><img alt="" draggable="true" src="https://pbs.twimg.com/profile_images/1/{user}_normal.jpg"></a></div>'
+            '<div data-testid="User-Names"><div><a href="/{user}" role="link"><div><span>{name}</span></div></a></div>'
+            '<div><a href="/{user}" role="link"><div>@{user}</div></a>'
+            '<a href="/{user}/status/{status}" aria-label="Nov {day}" dir="ltr" role="link"><time datetime="2022-11-{day:02d}T16:00:{second:02d}.000Z">Nov {day}</time></a></div></div>'
+            '<div data-testid="tweetText" dir="auto" lang="bn"><span>খবর {number} </span><a href="/hashtag/FIFA?src=hashtag_click">#FIFA</a>'
+            '<span> </span><a href="/someone" role="link">@someone</a></div>'
+            '<div data-testid="tweetPhoto"><img alt="Image" draggable="true" src="https://pbs.twimg.com/media/F{number}?format=jpg&amp;name=small"></div>'
+            '<div role="group"><div data-testid="reply" aria-label="{replies} Replies. Reply"></div>'
+            '<div data-testid="retweet" aria-label="{retweets} Retweets. Retweet"></div>'
+            '<div data-testid="like" aria-label="{likes} Likes. Like"></div></div></div></article>').format(
+        social=social, user=user, name="BBC News (World)" if retweet else "BBC News বাংলা", status=status,
+        day=20 - number // 4, second=number % 60, number=number, replies=number, retweets=number * 2, likes=number * 3)
+
+
+def timeline(*numbers, retweets=(5,)):
+    """the snapshot of one scroll step showing the tweets of the numbers"""
+    return '<html><body><main role="main"><section><div>{}</div></section></main></body></html>'.format("".join(
+        article(number, "BBCWorld", True) if number in retweets else article(number) for number in numbers))
+
+
+class Response:
+    def __init__(self, body):
+        self.body = body
+        self.status_code = 200
+        self.headers = {"Content-Type": "application/json", "Content-Encoding": "identity"}
+
+
+class Request:
+    def __init__(self, url, body=b"{}"):
+        self.url = url
+        self.method = "GET"
+        self.response = Response(body)
+
+
+class WireDriver:
+    """the part of a selenium-wire driver ScrapeRecorder reads, counting the
+    requests it hands out"""
+    current_url = "https://twitter.com/bbcbangla"
+
+    def __init__(self):
+        self.html = "<html><body></body></html>"
+        self.captured = []
+        self.read = 0
+
+    def execute_script(self, script):
+        assert script == SNAPSHOT_SCRIPT
+        return self.html
+
+    @property
+    def requests(self):
+        self.read += len(self.captured)
+        return list(self.captured)
+
+    @requests.deleter
+    def requests(self):
+        self.captured = []
+
+
+def test_replays_recorded_profile():
+    data = replay_profile(ARCHIVE, tweets_count=30)
+    assert list(data) == [str(FIRST + number) for number in range(14)]
+    tweet = data[str(FIRST + 2)]
+    assert tweet["username"] == "bbcbangla"
+    assert tweet["name"] == "BBC News বাংলা"
+    assert tweet["content"] == "খবর 2 #FIFA @someone"
+    assert tweet["hashtags"] == ["FIFA"] and tweet["mentions"] == ["someone"]
+    assert (tweet["replies"], tweet["retweets"], tweet["likes"]) == (2, 4, 6)
+    assert tweet["posted_time"] == "2022-11-20T16:00:02+00:00"
+    assert tweet["images"] == ["https://pbs.twimg.com/media/F2?format=jpg&name=small"]
+    assert tweet["tweet_url"] == "https://twitter.com/bbcbangla/status/{}".format(FIRST + 2)
+    retweet = data[str(FIRST + 5)]
+    assert retweet["is_retweet"] and retweet["name"] == "BBC News (World)"
+
+
+def test_stops_at_tweets_count():
+    assert list(replay_profile(ARCHIVE, tweets_count=4)) == [str(FIRST + number) for number in range(4)]
+
+
+def test_recorded_responses_are_served():
+    driver = ReplayDriver(ARCHIVE)
+    assert [json.loads(request.response.body) for request in driver.requests] == [
+        {"data": {"step": step}} for step in range(4)]
+    assert all("/i/api/" in request.url for request in driver.requests)
+
+
+def test_waiting_for_tweets_of_a_recording_does_not_block(tmp_path):
+    recorder = ScrapeRecorder(str(tmp_path / "empty.zip"), "bbcbangla")
+    recorder.capture(WireDriver())
+    recorder.save()
+    driver = ReplayDriver(str(tmp_path / "empty.zip"))
+    started = time.time()
+    Utilities.wait_until_completion(driver)
+    Utilities.wait_until_tweets_appear(driver)
+    assert time.time() - started < 1
+
+
+def test_capture_reads_every_request_once(tmp_path):
+    recorder = ScrapeRecorder(str(tmp_path / "steps.zip"), "bbcbangla")
+    driver = WireDriver()
+    for step in range(50):
+        driver.captured += [Request("https://twitter.com/i/api/graphql/KEY/UserTweets?step={}".format(step)),
+                            Request("https://abs.twimg.com/main.js")]
+        recorder.capture(driver)
+    assert driver.read == 100
+    assert len(recorder.responses) == 50 and len(recorder.snapshots) == 50
+
+
+def test_recorded_session_replays_its_tweets(tmp_path):
+    recorder = ScrapeRecorder(str(tmp_path / "session.zip"), "bbcbangla")
+    driver = WireDriver()
+    for step, numbers in enumerate([(20, 21, 22), (22, 23), (23, 24, 25)]):
+        driver.html = timeline(*numbers, retweets=(23,))
+        driver.captured.append(Request("https://twitter.com/i/api/graphql/KEY/UserTweets?step={}".format(step)))
+        recorder.capture(driver)
+    recorder.save()
+    data = replay_profile(str(tmp_path / "session.zip"), tweets_count=10)
+    assert list(data) == [str(FIRST + number) for number in range(20, 26)]
+    assert data[str(FIRST + 21)]["content"] == "খবর 21 #FIFA @someone"
+    assert (data[str(FIRST + 25)]["replies"], data[str(FIRST + 25)]["likes"]) == (25, 75)
+    assert [number for number in range(20, 26) if data[str(FIRST + number)]["is_retweet"]] == [23]
+    replayed = ReplayDriver(str(tmp_path / "session.zip"))
+    assert [Finder.is_retweet(tweet) for tweet in replayed.find_elements(By.CSS_SELECTOR, '[data-testid="tweet"]')] == [False] * 3
+    replayed.scroll()
+    assert [Finder.is_retweet(tweet) for tweet in replayed.find_elements(By.CSS_SELECTOR, '[data-testid="tweet"]')] == [False, True]
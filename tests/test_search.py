@@ -0,0 +1,104 @@
+import re
+import json
+import time
+from datetime import date
+from http.server import BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+import pytest
+from search_info import Search
+
+USER = {"screen_name": "bbcbangla", "name": "BBC News Bangla",
+        "profile_image_url_https": "https://pbs.twimg.com/profile_images/1/bbc_normal.jpg"}
+
+
+def legacy(tweet_id, day):
+    return {"id_str": tweet_id, "created_at": "Wed Nov {:02d} 10:00:00 +0000 2022".format(day),
+            "full_text": "tweet {}".format(tweet_id), "reply_count": 1, "retweet_count": 2, "favorite_count": 3,
+            "entities": {"hashtags": [], "user_mentions": [], "urls": []}, "user_id_str": "1"}
+
+
+class AdaptiveSearchHandler(BaseHTTPRequestHandler):
+    """3 tweets per day of the queried window, newest first, one per page.
+    Pages of windows starting on a day in server.slow take a while."""
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        params = {key: values[0] for key, values in parse_qs(urlparse(self.path).query).items()}
+        self.server.requests.append(params)
+        since, until = (int(day) for day in re.search(
+            r"since:2022-11-(\d+) until:2022-11-(\d+)", params["q"]).groups())
+        position = int(params.get("cursor", 0))
+        if since in self.server.slow:
+            time.sleep(0.2)
+        tweet_ids = ["{}{:02d}{}".format(1590, day, number) for day in range(until - 1, since - 1, -1)
+                     for number in range(3)]
+        tweets, entries = {}, []
+        if position < len(tweet_ids):
+            tweet_id = tweet_ids[position]
+            tweets[tweet_id] = legacy(tweet_id, int(tweet_id[4:6]))
+            entries = [{"entryId": "sq-I-t-" + tweet_id, "content": {"item": {"content": {"tweet": {"id": tweet_id}}}}},
+                       {"entryId": "sq-cursor-bottom", "content": {"operation": {"cursor": {"value": str(position + 1), "cursorType": "Bottom"}}}}]
+        body = json.dumps({"globalObjects": {"tweets": tweets, "users": {"1": USER}},
+                           "timeline": {"instructions": [{"addEntries": {"entries": entries}}]}}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def server(local_server):
+    return local_server(AdaptiveSearchHandler, slow=set())
+
+
+def make_search(server, **options):
+    return Search("from:bbcbangla", "2022-11-01", "2022-11-21", api_url=server.url + "/search",
+                  x_guest_token="guest", **options)
+
+
+def test_split_date_range_covers_every_day_once():
+    windows = Search.split_date_range(date(2022, 11, 1), date(2022, 11, 21), 3)
+    assert windows == [(date(2022, 11, 14), date(2022, 11, 21)), (date(2022, 11, 7), date(2022, 11, 14)),
+                       (date(2022, 11, 1), date(2022, 11, 7))]
+    assert Search.split_date_range(date(2022, 11, 1), date(2022, 11, 3), 8) == [
+        (date(2022, 11, 2), date(2022, 11, 3)), (date(2022, 11, 1), date(2022, 11, 2))]
+
+
+def test_dense_windows_are_split_until_every_tweet_is_found(server):
+    data = make_search(server, shards=3, workers=4, max_pages_per_window=5).scrap()
+    assert len(data) == 60
+    assert list(data) == sorted(data, key=int, reverse=True)
+    assert all(params["tweet_search_mode"] == "live" and params["query_source"] == "typed_query"
+               and "vertical" not in params for params in server.requests)
+
+
+def test_stops_at_tweets_count(server):
+    data = make_search(server, tweets_count=10, shards=1, workers=1).scrap()
+    assert list(data) == ["1590{:02d}{}".format(day, number) for day in (20, 19, 18, 17) for number in (2, 1, 0)][:10]
+
+
+def newest(count):
+    return ["1590{:02d}{}".format(day, number) for day in range(20, 0, -1) for number in (2, 1, 0)][:count]
+
+
+def test_slow_newest_window_is_waited_for(server):
+    # the windows start on Nov 14, 7 and 1, the older ones finish first
+    server.slow.add(14)
+    data = make_search(server, tweets_count=5, shards=3, workers=3).scrap()
+    assert list(data) == newest(5)
+
+
+def test_older_windows_are_not_waited_for(server):
+    server.slow.update({1, 7})
+    started = time.time()
+    data = make_search(server, tweets_count=5, shards=3, workers=3).scrap()
+    assert list(data) == newest(5)
+    assert time.time() - started < 2
+
+
+def test_dense_newest_window_is_split_before_stopping(server):
+    server.slow.add(14)
+    data = make_search(server, tweets_count=25, shards=3, workers=3, max_pages_per_window=4).scrap()
+    assert list(data) == newest(25)
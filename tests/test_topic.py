@@ -0,0 +1,91 @@
+import os
+import json
+from http.server import BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+import pytest
+import topic_info
+from topic_info import Topic
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "topic")
+# recorded TopicLandingPage responses, by the cursor that requests them
+PAGES = {None: "page-0.json", "DAACCgABF-bottom-1": "page-1.json", "DAACCgABF-bottom-2": "page-2.json"}
+BASE = 1590000000000000000
+
+
+class TopicLandingPageHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        variables = json.loads(parse_qs(url.query)["variables"][0])
+        self.server.requests.append({"key": url.path.split("/")[1], "variables": variables,
+                                     "headers": dict(self.headers)})
+        if url.path.split("/")[1] not in self.server.valid_keys:
+            self.send_response(404)
+            self.end_headers()
+            return
+        with open(os.path.join(FIXTURES, PAGES[variables.get("cursor")]), "rb") as file:
+            body = file.read()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def server(local_server):
+    return local_server(TopicLandingPageHandler, valid_keys={"KEY"})
+
+
+def make_topic(server, key_cache, tweets_count=100):
+    return Topic(12, "firefox", None, tweets_count, True, None, key_cache=key_cache,
+                 api_url=server.url + "/{}/TopicLandingPage",
+                 x_guest_token="guest")
+
+
+def write_key(location, key):
+    with open(location, "w", encoding="utf-8") as file:
+        json.dump({"TopicLandingPage": key, "UserTweets": "OTHER"}, file)
+
+
+def test_pages_recorded_timeline(server, tmp_path):
+    key_cache = str(tmp_path / "keys.json")
+    write_key(key_cache, "KEY")
+    data = make_topic(server, key_cache).scrap()
+    assert list(data) == [str(BASE + offset) for offset in (9, 8, 7, 6, 5, 4, -1, -2, -3, -4, -5)]
+    assert [request["variables"].get("cursor") for request in server.requests] == list(PAGES)
+    assert all(request["headers"]["x-guest-token"] == "guest" and request["headers"]["authorization"] == topic_info.AUTHORIZATION_KEY
+               for request in server.requests)
+    first = data[str(BASE + 9)]
+    assert first["username"] == "bbcbangla"
+    assert first["hashtags"] == ["বাংলাদেশ"]
+    assert first["images"] == ["https://pbs.twimg.com/media/F{}.jpg".format(BASE + 9)]
+    assert first["link"] == "https://www.bbc.com/bengali/news-1"
+    assert first["posted_time"] == "2022-11-03T12:15:00+00:00"
+    assert data[str(BASE + 8)]["videos"] == ["https://video.twimg.com/{}/vid/1280x720/a.mp4".format(BASE + 8)]
+    assert data[str(BASE + 8)]["mentions"] == ["BBCWorld"]
+    assert data[str(BASE + 7)]["retweet_link"] == "https://twitter.com/BBCWorld/status/{}".format(BASE + 1)
+    assert data[str(BASE + 6)]["content"] == "সংবাদ ৪"
+
+
+def test_stops_at_tweets_count_without_fetching_further(server, tmp_path):
+    key_cache = str(tmp_path / "keys.json")
+    write_key(key_cache, "KEY")
+    data = make_topic(server, key_cache, tweets_count=4).scrap()
+    assert list(data) == [str(BASE + offset) for offset in (9, 8, 7, 6)]
+    assert len(server.requests) <= 2
+
+
+def test_outdated_key_is_found_again_and_cached(server, tmp_path, monkeypatch, fake_browser):
+    key_cache = str(tmp_path / "keys.json")
+    write_key(key_cache, "OUTDATED")
+    fake_browser(topic_info)
+    monkeypatch.setattr(topic_info.Finder, "find_graphql_key",
+                        staticmethod(lambda driver, url: "KEY"))
+    data = make_topic(server, key_cache).scrap()
+    assert len(data) == 11
+    assert [request["key"] for request in server.requests][:2] == ["OUTDATED", "KEY"]
+    with open(key_cache, encoding="utf-8") as file:
+        assert json.load(file) == {"TopicLandingPage": "KEY", "UserTweets": "OTHER"}
+    assert os.listdir(str(tmp_path)) == ["keys.json"]
@@ -0,0 +1,59 @@
+import pytest
+import watch_info
+from watch_info import Watcher
+
+
+def tweet(tweet_id, likes=1):
+    return {"tweet_id": tweet_id, "likes": likes, "retweets": 0, "replies": 0}
+
+
+def timeline(*tweets):
+    return {item["tweet_id"]: item for item in tweets}
+
+
+@pytest.fixture
+def timelines(fake_browser):
+    """every poll scrapes the next of the timelines appended by the test"""
+    return fake_browser(watch_info)
+
+
+def test_pinned_tweets_and_old_retweets_are_not_new(timelines):
+    watcher = Watcher(["bbcbangla"], recent_count=3)
+    pinned, old_retweet = tweet("100"), tweet("200")
+    timelines.append(timeline(pinned, tweet("1005"), tweet("1004"), old_retweet, tweet("1003")))
+    timelines.append(timeline(pinned, tweet("1005"), tweet("1004"), old_retweet, tweet("1003")))
+    timelines.append(timeline(pinned, tweet("1006"), tweet("1005", likes=9), tweet("1004")))
+    timelines.append(timeline(pinned, tweet("1006"), tweet("1005", likes=9), old_retweet))
+    assert watcher.poll("bbcbangla") == []
+    assert watcher.poll("bbcbangla") == []
+    events = watcher.poll("bbcbangla")
+    assert [(event["type"], event["tweet_id"]) for event in events] == [("new_tweet", "1006"), ("engagement", "1005")]
+    assert events[1]["changes"] == {"likes": {"old": 1, "new": 9}}
+    # seen by the poll before the previous one only, but not new
+    assert watcher.poll("bbcbangla") == []
+
+
+def test_retweet_of_an_old_tweet_is_new_once(timelines):
+    watcher = Watcher(["bbcbangla"], recent_count=3)
+    timelines.append(timeline(tweet("1002"), tweet("1001")))
+    timelines.append(timeline(tweet("50"), tweet("1002"), tweet("1001")))
+    timelines.append(timeline(tweet("50"), tweet("1002"), tweet("1001")))
+    assert watcher.poll("bbcbangla") == []
+    assert [event["tweet_id"] for event in watcher.poll("bbcbangla")] == ["50"]
+    assert watcher.poll("bbcbangla") == []
+
+
+def test_profile_without_tweets_reports_its_first_tweet(timelines):
+    watcher = Watcher(["bbcbangla"])
+    timelines.extend([timeline(), timeline(), timeline(tweet("1001"))])
+    assert watcher.poll("bbcbangla") == []
+    assert watcher.poll("bbcbangla") == []
+    assert [(event["type"], event["tweet_id"]) for event in watcher.poll("bbcbangla")] == [("new_tweet", "1001")]
+
+
+def test_failed_poll_is_not_the_first_poll(timelines):
+    watcher = Watcher(["bbcbangla"])
+    timelines.extend([None, timeline(tweet("1001")), timeline(tweet("1002"), tweet("1001"))])
+    assert watcher.poll("bbcbangla") == []
+    assert watcher.poll("bbcbangla") == []
+    assert [event["tweet_id"] for event in watcher.poll("bbcbangla")] == ["1002"]
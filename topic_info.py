@@ -0,0 +1,225 @@
+import os
+import json
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Union
+from profile_info import Initializer, Scraping_utilities, Finder, save_output, logger, AUTHORIZATION_KEY
+
+
+TOPIC_URL = "https://twitter.com/i/topics/{}"
+GRAPHQL_URL = "https://twitter.com/i/api/graphql/{}/TopicLandingPage"
+KEY_CACHE = os.path.join(os.path.expanduser("~"), ".twitter_graphql_keys.json")
+
+
+class Topic:
+    """this class needs to be instantiated in order to scrape tweets of a
+    twitter topic. The browser is only started once to find the GraphQL query
+    key of TopicLandingPage, the timeline itself is paged over HTTP."""
+
+    def __init__(self, rest_id, browser, proxy, tweets_count, headless, browser_profile,
+                 key_cache=KEY_CACHE, api_url=GRAPHQL_URL, x_guest_token=None):
+        self.rest_id = str(rest_id)
+        self.URL = TOPIC_URL.format(self.rest_id)
+        self.browser = browser
+        self.proxy = proxy
+        self.tweets_count = tweets_count
+        self.headless = headless
+        self.browser_profile = browser_profile
+        self.key_cache = key_cache
+        self.api_url = api_url
+        self.x_guest_token = x_guest_token
+        self.posts_data = {}
+
+    def __read_cached_key(self) -> Union[str, None]:
+        try:
+            with open(self.key_cache, encoding="utf-8") as file:
+                return json.load(file).get("TopicLandingPage")
+        except (OSError, ValueError):
+            return None
+
+    def __cache_key(self, key):
+        try:
+            keys = {}
+            if os.path.exists(self.key_cache):
+                with open(self.key_cache, encoding="utf-8") as file:
+                    keys = json.load(file)
+            keys["TopicLandingPage"] = key
+            # written next to the cache and renamed over it, so a concurrent
+            # reader never sees a half written file
+            descriptor, temporary = tempfile.mkstemp(
+                dir=os.path.dirname(os.path.abspath(self.key_cache)), suffix=".tmp")
+            try:
+                with os.fdopen(descriptor, "w", encoding="utf-8") as file:
+                    json.dump(keys, file)
+                os.replace(temporary, self.key_cache)
+            except BaseException:
+                os.remove(temporary)
+                raise
+        except (OSError, ValueError) as ex:
+            logger.warning("Error at cache_key : {}".format(ex))
+
+    def find_graphql_key(self, refresh=False) -> Union[str, None]:
+        """returns the cached GraphQL key, or opens the topic page once in the
+        browser to find it"""
+        if not refresh:
+            key = self.__read_cached_key()
+            if key:
+                return key
+        driver = Initializer(self.browser, self.headless,
+                             self.proxy, self.browser_profile).init()
+        try:
+            key = Finder.find_graphql_key(driver, self.URL)
+        finally:
+            driver.close()
+            driver.quit()
+        if key:
+            self.__cache_key(key)
+        return key
+
+    def __fetch_page(self, key, headers, cursor=None) -> Union[dict, None]:
+        return Scraping_utilities.make_http_request_with_params(
+            self.api_url.format(key), Scraping_utilities.build_topic_params(self.rest_id, cursor), headers, self.proxy)
+
+    @staticmethod
+    def find_instructions(response) -> list:
+        """finds the timeline instructions, wherever they are nested in the response"""
+        if isinstance(response, dict):
+            if isinstance(response.get("instructions"), list):
+                return response["instructions"]
+            values = response.values()
+        elif isinstance(response, list):
+            values = response
+        else:
+            return []
+        for value in values:
+            instructions = Topic.find_instructions(value)
+            if instructions:
+                return instructions
+        return []
+
+    @staticmethod
+    def find_entries(response) -> list:
+        """finds all timeline entries of the page"""
+        entries = []
+        for instruction in Topic.find_instructions(response):
+            if "entries" in instruction:
+                entries.extend(instruction["entries"])
+            elif "entry" in instruction:
+                entries.append(instruction["entry"])
+        return entries
+
+    @staticmethod
+    def find_cursor(entries) -> Union[str, None]:
+        """finds the cursor pointing to the next page"""
+        for entry in entries:
+            content = entry.get("content", {})
+            if content.get("cursorType") == "Bottom":
+                return content.get("value")
+        return None
+
+    @staticmethod
+    def find_tweet_results(entries) -> list:
+        """finds the tweet results of all single and grouped timeline items"""
+        results = []
+        for entry in entries:
+            content = entry.get("content", {})
+            items = [content] + [item.get("item", {})
+                                 for item in content.get("items", [])]
+            for item in items:
+                result = item.get("itemContent", {}).get(
+                    "tweet_results", {}).get("result")
+                if result:
+                    results.append(result)
+        return results
+
+    @staticmethod
+    def parse_tweet(result) -> Union[dict, None]:
+        """converts a GraphQL tweet result to the record written by scrape_profile"""
+        try:
+            if result.get("__typename") == "TweetWithVisibilityResults":
+                result = result["tweet"]
+            legacy = result["legacy"]
+            user = result["core"]["user_results"]["result"]["legacy"]
+            tweet_id = result.get("rest_id") or legacy["id_str"]
+            retweeted = legacy.get(
+                "retweeted_status_result", {}).get("result")
+            retweet_link = ""
+            if retweeted:
+                retweet_link = "https://twitter.com/{}/status/{}".format(
+                    retweeted["core"]["user_results"]["result"]["legacy"]["screen_name"], retweeted["rest_id"])
+            return Scraping_utilities.build_tweet_record(tweet_id, legacy, user, retweet_link)
+        except Exception as ex:
+            logger.warning("Error at parse_tweet : {}".format(ex))
+
+    def scrap(self):
+        try:
+            cached_key = self.__read_cached_key()
+            key = cached_key or self.find_graphql_key(refresh=True)
+            if not key:
+                logger.warning("Failed to find GraphQL key!")
+                return None
+            x_guest_token = self.x_guest_token or Scraping_utilities.find_x_guest_token(
+                AUTHORIZATION_KEY, self.proxy)
+            headers = Scraping_utilities.build_topic_headers(
+                x_guest_token, AUTHORIZATION_KEY, self.rest_id)
+            response = self.__fetch_page(key, headers)
+            if response is None and cached_key:
+                # the cached key may be outdated after a twitter deployment
+                key = self.find_graphql_key(refresh=True)
+                response = self.__fetch_page(key, headers) if key else None
+            # one page is always downloading while the previous one is parsed
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                seen_cursors = set()
+                while response is not None and len(self.posts_data) < self.tweets_count:
+                    entries = Topic.find_entries(response)
+                    cursor = Topic.find_cursor(entries)
+                    next_page = None
+                    if cursor and cursor not in seen_cursors:
+                        seen_cursors.add(cursor)
+                        next_page = executor.submit(
+                            self.__fetch_page, key, headers, cursor)
+                    found = 0
+                    for result in Topic.find_tweet_results(entries):
+                        tweet = Topic.parse_tweet(result)
+                        if tweet and tweet["tweet_id"] not in self.posts_data:
+                            self.posts_data[tweet["tweet_id"]] = tweet
+                            found += 1
+                    if next_page is None or found == 0:
+                        if next_page is not None:
+                            next_page.cancel()
+                        break
+                    if len(self.posts_data) >= self.tweets_count:
+                        next_page.cancel()
+                        break
+                    response = next_page.result()
+            return dict(list(self.posts_data.items())[0:int(self.tweets_count)])
+        except Exception as ex:
+            logger.exception("Error at method scrap : {} ".format(ex))
+
+
+def scrape_topic(rest_id: Union[str, int], browser: str = "firefox", proxy: Union[str, None] = None,
+                 tweets_count: int = 30, output_format: str = "json", filename: str = "", directory: str = os.getcwd(),
+                 headless: bool = True, browser_profile: Union[str, None] = None, compression: Union[str, None] = None,
+                 compression_level: int = 3):
+    """Scrap tweets of a twitter topic using the rest id of the topic.
+
+    Args:
+        rest_id (Union[str, int]): Rest id of the topic, the number at the end of https://twitter.com/i/topics/<rest_id>.
+        browser (str, optional): Which browser to use for finding the GraphQL key?, Chrome, Edge and Firefox are supported. Defaults to "firefox".
+        proxy (Union[str, None], optional): Optional parameter, if user wants to use proxy for scraping. If the proxy is authenticated proxy then the proxy format is username:password@host:port. Defaults to None.
+        tweets_count (int, optional): Number of posts to scrap. Defaults to 30.
+        output_format (str, optional): The output format, whether JSON, JSONL or CSV. Defaults to "json".
+        filename (str, optional): Name of the output file without extension. If output_format is CSV and it is not passed then the rest id is used. Defaults to "".
+        directory (str, optional): Directory where the output file is saved. Defaults to os.getcwd().
+        headless (bool, optional): Whether to run browser in headless mode?. Defaults to True.
+        browser_profile (Union[str, None], optional): Path of Browser Profile where cookies might be located to scrap data in authenticated way. Defaults to None.
+        compression (Union[str, None], optional): "zstd" to write a compressed <filename>.jsonl.zst or <filename>.csv.zst. Defaults to None.
+        compression_level (int, optional): zstd compression level, from 1 (fastest) to 22 (smallest). Defaults to 3.
+
+    Returns:
+        str: tweets data in CSV or JSON
+    """
+    topic_bot = Topic(rest_id, browser, proxy,
+                      tweets_count, headless, browser_profile)
+    data = topic_bot.scrap()
+    return save_output(data or {}, output_format, filename, directory, str(rest_id), compression, compression_level)
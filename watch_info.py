@@ -0,0 +1,207 @@
+import json
+import time
+import heapq
+import logging
+from typing import Union, Callable
+from profile_info import Initializer, Profile, logger
+from browser_cache import WarmCache
+
+
+# engagement counts compared between two polls of the same tweet
+ENGAGEMENT_FIELDS = ("likes", "retweets", "replies")
+
+
+def log_event(event: dict):
+    """default on_event handler, logs the event as JSON"""
+    logger.setLevel(logging.INFO)
+    logger.info(json.dumps(event, ensure_ascii=False))
+
+
+class Watcher:
+    """
+    Polls a list of twitter profiles over and over with one browser that
+    stays open between polls. A poll only scrolls until it meets the tweets
+    seen by the previous poll again, and reports new tweets and changed
+    engagement counts of recent tweets as events.
+
+    A tweet is new if neither this poll nor the previous one saw it, not if
+    its id is newer: pinned tweets and retweets carry old ids wherever they
+    are on the timeline.
+
+    Every profile has its own interval: it is halved when a poll found
+    changes and grows by half when it did not, so active profiles are polled
+    often and dormant ones rarely.
+    """
+
+    def __init__(self, usernames: list, interval: float = 300, min_interval: float = 60, max_interval: float = 6 * 3600,
+                 browser: str = "firefox", proxy: Union[str, None] = None, headless: bool = True,
+                 browser_profile: Union[str, None] = None, recent_count: int = 10, max_new_tweets: int = 50,
+                 known_overlap: int = 3, on_event: Callable = log_event, warm_cache: Union[str, None] = None):
+        """Initialize Watcher
+
+        Args:
+            usernames (list): Twitter usernames to watch.
+            interval (float, optional): Seconds between the first polls of a profile. Defaults to 300.
+            min_interval (float, optional): Shortest interval an active profile gets. Defaults to 60.
+            max_interval (float, optional): Longest interval a dormant profile gets. Defaults to 6 hours.
+            browser (str, optional): Which browser to use for scraping?, Chrome, Edge and Firefox are supported. Defaults to "firefox".
+            proxy (Union[str, None], optional): Optional parameter, if user wants to use proxy for scraping. If the proxy is authenticated proxy then the proxy format is username:password@host:port. Defaults to None.
+            headless (bool, optional): Whether to run browser in headless mode?. Defaults to True.
+            browser_profile (Union[str, None], optional): Path of Browser Profile where cookies might be located to scrap data in authenticated way. Defaults to None.
+            recent_count (int, optional): Number of newest tweets per profile whose engagement counts are compared. Defaults to 10.
+            max_new_tweets (int, optional): Most tweets a single poll scrolls through. Defaults to 50.
+            known_overlap (int, optional): Number of already seen tweets after which a poll stops scrolling. Defaults to 3.
+            on_event (Callable, optional): Called with every event dictionary. Defaults to log_event.
+            warm_cache (Union[str, None], optional): Directory where the browser profile and disk cache are kept, so a restarted browser starts with a warm cache. Defaults to None.
+        """
+        self.interval = interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.browser = browser
+        self.proxy = proxy
+        self.headless = headless
+        self.browser_profile = browser_profile
+        self.recent_count = recent_count
+        self.max_new_tweets = max_new_tweets
+        self.known_overlap = known_overlap
+        self.on_event = on_event
+        self.warm_cache = WarmCache(warm_cache, browser) if warm_cache else None
+        self.cache_slot = None
+        self.driver = None
+        self.profiles = {}
+        self.schedule = []
+        for username in usernames:
+            self.add(username)
+
+    def add(self, username: str, due: Union[float, None] = None):
+        """starts watching another profile"""
+        if username in self.profiles:
+            return
+        self.profiles[username] = {
+            "recent": {}, "seen": set(), "previous": set(), "polled": False, "interval": self.interval}
+        heapq.heappush(self.schedule, (due or time.time(), username))
+
+    def __start_driver(self):
+        if self.driver is None:
+            cache_size = None
+            if self.warm_cache is not None:
+                self.cache_slot = self.warm_cache.acquire()
+                cache_size = self.warm_cache.max_bytes
+            self.driver = Initializer(
+                self.browser, self.headless, self.proxy, self.browser_profile, self.cache_slot, cache_size).init()
+        return self.driver
+
+    def close(self):
+        if self.driver is not None:
+            try:
+                self.driver.close()
+                self.driver.quit()
+            except Exception as ex:
+                logger.warning("Error at close : {}".format(ex))
+            self.driver = None
+        if self.cache_slot is not None:
+            self.warm_cache.release(self.cache_slot)  # type: ignore
+            self.cache_slot = None
+
+    @staticmethod
+    def find_changes(username: str, recent: dict, seen: set, data: dict, first_poll: bool) -> list:
+        """compares the tweets of a poll with the tweets seen and the recent
+        engagement counts of the previous poll and returns the events"""
+        events = []
+        for tweet_id, tweet in data.items():
+            if tweet_id in recent:
+                changes = {}
+                for field in ENGAGEMENT_FIELDS:
+                    old, new = recent[tweet_id].get(field), tweet.get(field)
+                    if new not in (None, "") and old != new:
+                        changes[field] = {"old": old, "new": new}
+                if changes:
+                    events.append({"type": "engagement", "username": username,
+                                   "tweet_id": tweet_id, "changes": changes})
+            elif tweet_id not in seen and not first_poll:
+                events.append({"type": "new_tweet", "username": username,
+                               "tweet_id": tweet_id, "tweet": tweet})
+        return events
+
+    def poll(self, username: str) -> list:
+        """scrapes a profile down to the tweets seen last time and returns the events"""
+        state = self.profiles[username]
+        # the first poll only learns the timeline, a profile without tweets
+        # reports its first tweet as new like any other
+        first_poll = not state["polled"]
+        tweets_count = self.recent_count if first_poll else self.max_new_tweets + \
+            len(state["recent"])
+        profile_bot = Profile(username, self.browser, self.proxy, tweets_count, self.headless, self.browser_profile,
+                              driver=self.__start_driver(), known_tweets=state["recent"], known_overlap=self.known_overlap)
+        data = profile_bot.scrap()
+        if data is None:
+            # the browser may have crashed, start a new one for the next poll
+            self.close()
+            return []
+        state["polled"] = True
+        events = Watcher.find_changes(
+            username, state["recent"], state["seen"], data, first_poll)
+        recent = dict(state["recent"])
+        for tweet_id, tweet in data.items():
+            recent[tweet_id] = {field: tweet.get(field)
+                                for field in ENGAGEMENT_FIELDS}
+        newest = sorted(recent, key=int, reverse=True)[:self.recent_count]
+        state["recent"] = {tweet_id: recent[tweet_id] for tweet_id in newest}
+        # the previous poll may have stopped scrolling above tweets this one
+        # reached, so they stay known for one more poll
+        state["seen"] = set(data) | state["previous"]
+        state["previous"] = set(data)
+        return events
+
+    def __reschedule(self, username, changed):
+        state = self.profiles[username]
+        if changed:
+            state["interval"] = max(self.min_interval, state["interval"] / 2)
+        else:
+            state["interval"] = min(
+                self.max_interval, state["interval"] * 1.5)
+        heapq.heappush(self.schedule, (time.time() +
+                       state["interval"], username))
+
+    def run(self, max_polls: Union[int, None] = None):
+        """polls the profile that is due next until max_polls polls were made,
+        or forever if max_polls is not passed"""
+        polls = 0
+        try:
+            while self.schedule and (max_polls is None or polls < max_polls):
+                due, username = heapq.heappop(self.schedule)
+                delay = due - time.time()
+                if delay > 0:
+                    time.sleep(delay)
+                try:
+                    events = self.poll(username)
+                except Exception as ex:
+                    logger.exception("Error at poll : {}".format(ex))
+                    events = []
+                for event in events:
+                    self.on_event(event)
+                self.__reschedule(username, len(events) > 0)
+                polls += 1
+        finally:
+            self.close()
+
+
+def watch(usernames: list, interval: float = 300, browser: str = "firefox", proxy: Union[str, None] = None,
+          headless: bool = True, browser_profile: Union[str, None] = None, on_event: Callable = log_event,
+          max_polls: Union[int, None] = None, **options):
+    """Watch twitter profiles for new tweets and changed likes, retweets and replies.
+
+    Args:
+        usernames (list): Twitter usernames to watch.
+        interval (float, optional): Seconds between the first polls of a profile, later adjusted to how active the profile is. Defaults to 300.
+        browser (str, optional): Which browser to use for scraping?, Chrome, Edge and Firefox are supported. Defaults to "firefox".
+        proxy (Union[str, None], optional): Optional parameter, if user wants to use proxy for scraping. If the proxy is authenticated proxy then the proxy format is username:password@host:port. Defaults to None.
+        headless (bool, optional): Whether to run browser in headless mode?. Defaults to True.
+        browser_profile (Union[str, None], optional): Path of Browser Profile where cookies might be located to scrap data in authenticated way. Defaults to None.
+        on_event (Callable, optional): Called with every new_tweet and engagement event. Defaults to log_event.
+        max_polls (Union[int, None], optional): Stop after this many polls, runs forever if not passed. Defaults to None.
+        **options: min_interval, max_interval, recent_count, max_new_tweets, known_overlap and warm_cache of Watcher.
+    """
+    watcher = Watcher(usernames, interval, browser=browser, proxy=proxy, headless=headless,
+                      browser_profile=browser_profile, on_event=on_event, **options)
+    watcher.run(max_polls)